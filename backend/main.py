@@ -11,7 +11,8 @@ from dotenv import load_dotenv
 
 # Services
 from backend.services.alert_service import check_alerts
-from backend.services.log_service import add_log
+from backend.services import crypto_service, http_client
+from backend.services.log_service import add_log, flush_logs
 
 # Routers (import directly from submodules to avoid circular imports)
 import backend.routes.prices as price
@@ -105,6 +106,30 @@ def background_alert_checker():
         add_log("error", f"Periodic alert check failed: {e}")
 
 
+@app.on_event("startup")
+async def open_http_client():
+    # One pooled (HTTP/2 when available) client for all outbound calls
+    await http_client.start()
+
+
+@app.on_event("startup")
+async def start_chain_probe():
+    # No RPC at startup; the probe's first eth_blockNumber runs one interval later
+    crypto_service.start_chain_probe()
+
+
+@app.on_event("shutdown")
+async def close_http_client():
+    crypto_service.stop_chain_probe()
+    await http_client.close()
+    await crypto_service.aclose()
+
+
+@app.on_event("shutdown")
+def flush_audit_log():
+    flush_logs()
+
+
 if __name__ == "__main__":
     import uvicorn
 
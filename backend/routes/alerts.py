@@ -1,12 +1,16 @@
 # backend/routes/alerts.py
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from backend.services.alert_service import (
     get_alerts, check_alerts, clear_alerts,
-    AlertLevel, trigger_demo_event, resolve_alert
+    AlertLevel, AlertType, trigger_demo_event, resolve_alert, alert_stream,
+    get_alert, acknowledge_alert, get_check_stats
 )
-from backend.services.alert_watcher import get_recent_alerts
+from backend.services.alert_rules import get_rules
+from backend.services.live_tail import parse_last_event_id, sse_stream
+from backend.services.alert_watcher import get_recent_alerts, get_watcher_stats
 from backend.services.log_service import add_log
 
 router = APIRouter(tags=["alerts"])
@@ -22,6 +26,12 @@ class AlertOut(BaseModel):
     plans: Optional[List[Dict[str, Any]]] = None
     summary: Optional[str] = None
     advisor_output: Optional[Dict[str, Any]] = None
+    fingerprint: Optional[str] = None
+    count: Optional[int] = None
+    last_seen: Optional[str] = None
+    last_message: Optional[str] = None
+    acknowledged: Optional[bool] = None
+    acknowledged_at: Optional[str] = None
 
 class AlertsResponse(BaseModel):
     alerts: List[AlertOut]
@@ -43,6 +53,26 @@ def fetch_alerts(limit: int = Query(20, ge=1, le=200), run_check: bool = False):
             {"id": 999, "level": "info", "type": "demo", "message": "Demo alert active"}
         ], count=1)
 
+@router.get("/stream")
+async def stream_alerts(request: Request,
+                        level: Optional[AlertLevel] = None,
+                        type_: Optional[AlertType] = Query(None, alias="type"),
+                        after_id: Optional[int] = None,
+                        last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")):
+    """Server-sent events for new alerts; resumes after Last-Event-ID (or ?after_id=)."""
+    lvl = level.value if level else None
+    atype = type_.value if type_ else None
+    last_id = parse_last_event_id(last_event_id)
+    if last_id is None: last_id = after_id
+    events = sse_stream(
+        request, alert_stream,
+        backlog=lambda after: get_alerts(limit=200, level=lvl, atype=atype, after_id=after),
+        matches=lambda a: (lvl is None or a.get("level") == lvl) and (atype is None or a.get("type") == atype),
+        last_id=last_id, event="alert",
+    )
+    return StreamingResponse(events, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @router.delete("/")
 def reset_alerts():
     try:
@@ -62,6 +92,32 @@ def resolve(alert_id: int):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/rules")
+def list_rules():
+    return [r.to_dict() for r in get_rules()]
+
+@router.get("/watcher/stats")
+def watcher_stats():
+    return get_watcher_stats()
+
+@router.get("/checks/last")
+def last_check():
+    return get_check_stats()
+
+@router.get("/{alert_id}", response_model=AlertOut)
+def fetch_alert(alert_id: int):
+    alert = get_alert(alert_id)
+    if alert is None:
+        raise HTTPException(404, detail="Alert not found")
+    return alert
+
+@router.post("/{alert_id}/ack", response_model=AlertOut)
+def acknowledge(alert_id: int):
+    alert = acknowledge_alert(alert_id)
+    if alert is None:
+        raise HTTPException(404, detail="Alert not found")
+    return alert
+
 @router.post("/trigger")
 def trigger_alert(event_type: str = Query(...)):
     try:
@@ -1,8 +1,13 @@
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
 from backend.services.crypto_service import (
-    get_price, get_balance, check_tx, is_chain_enabled,
+    get_price, aget_balance, get_balances, get_token_balances, acheck_tx, is_chain_enabled, chain,
     DEMO_WALLET, JUDGE_WALLET, EXPLORER
 )
+from backend.services.single_flight import flights
+from backend.services.token_registry import tokens
+from backend.services.watchlist_service import get_watchlist, add_wallet, remove_wallet
 
 try:
     from backend.portia_client import run_agent as _run_agent
@@ -14,7 +19,19 @@ router = APIRouter(tags=["crypto"])
 
 @router.get("/health")
 def health():
-    return {"ok": True, "mode": "api" if is_chain_enabled() else "mock"}
+    return {"ok": True, "mode": "api" if is_chain_enabled() else "mock", "chain": chain.stats()}
+
+
+@router.get("/upstream/stats")
+def upstream_stats():
+    """Single-flight counters: upstream calls made vs callers that shared an in-flight call."""
+    return flights.stats()
+
+
+@router.get("/tokens/stats")
+def token_stats():
+    """Token registry LRUs: checksummed addresses, contract objects, symbol/decimals metadata."""
+    return tokens.stats()
 
 
 @router.get("/price")
@@ -30,9 +47,9 @@ def price(symbol: str = Query("USDC")):
 
 
 @router.get("/wallet/balance")
-def balance(address: str = Query(DEMO_WALLET)):
+async def balance(address: str = Query(DEMO_WALLET)):
     try:
-        return get_balance(address)
+        return await aget_balance(address)
     except Exception:
         # fallback demo balance
         return {
@@ -43,6 +60,41 @@ def balance(address: str = Query(DEMO_WALLET)):
         }
 
 
+class WatchWallet(BaseModel):
+    address: str
+    label: Optional[str] = None
+
+
+@router.get("/watchlist")
+def watchlist(balances: bool = Query(False), token: Optional[str] = Query(None)):
+    """Watched wallets; `balances` adds ETH + USDC, `token` adds that ERC-20's balance."""
+    wallets = get_watchlist()
+    if balances and wallets:
+        res = get_balances([w["address"] for w in wallets])
+        for w in wallets:
+            w["balance"] = res.get(w["address"])
+    if token and wallets:
+        res = get_token_balances([w["address"] for w in wallets], token)
+        for w in wallets:
+            w["token_balance"] = res.get(w["address"])
+    return {"wallets": wallets, "count": len(wallets)}
+
+
+@router.post("/watchlist")
+def watch(body: WatchWallet):
+    try:
+        return add_wallet(body.address, body.label)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/watchlist/{address}")
+def unwatch(address: str):
+    if not remove_wallet(address):
+        raise HTTPException(404, detail="Wallet not in watchlist")
+    return {"ok": True, "address": address.lower()}
+
+
 @router.post("/transfer")
 def transfer(
     receiver: str = Query(JUDGE_WALLET),
@@ -68,9 +120,9 @@ def transfer(
 
 
 @router.post("/check_tx")
-def check(tx_hash: str = Query("0xDEMOHASH")):
+async def check(tx_hash: str = Query("0xDEMOHASH")):
     try:
-        return check_tx(tx_hash)
+        return await acheck_tx(tx_hash)
     except Exception:
         # fallback demo response
         return {"tx_hash": tx_hash, "status": "confirmed"}
@@ -1,11 +1,16 @@
 # backend/routes/logs.py
 
+import json
 from datetime import datetime
 from typing import Any, Dict, List, Optional
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from backend.services.log_service import get_logs, clear_logs, LogType, add_log
+from backend.services.live_tail import parse_last_event_id, sse_stream
+from backend.services.log_service import (
+    get_logs, iter_logs, search_logs, clear_logs, LogType, add_log, get_log_stats, log_stream
+)
 
 # ❌ remove prefix
 router = APIRouter(tags=["logs"])
@@ -16,10 +21,16 @@ class LogEntryOut(BaseModel):
     message: str
     timestamp: str
     context: Optional[Dict[str, Any]] = None
+    # set when repeats were coalesced into this entry
+    repeat: Optional[int] = None
+    last_timestamp: Optional[str] = None
+    last_message: Optional[str] = None
 
 class LogsResponse(BaseModel):
     logs: List[LogEntryOut]
     count: int
+    next_before_id: Optional[int] = None  # pass as before_id for the previous (older) page
+    next_after_id: Optional[int] = None   # pass as after_id for the next (newer) page
 
 def _validate_types(type_: Optional[str], types: Optional[List[str]]) -> Optional[List[LogType]]:
     vals = [t.lower() for t in ([type_] if type_ else []) + (types or [])]
@@ -29,18 +40,77 @@ def _validate_types(type_: Optional[str], types: Optional[List[str]]) -> Optiona
     except Exception:
         raise HTTPException(422, detail="Invalid log type. Use: info, success, warning, error, action")
 
+def _parse_since(since: Optional[str]) -> Optional[datetime]:
+    if not since: return None
+    try: return datetime.fromisoformat(since)
+    except Exception: raise HTTPException(422, detail="Invalid 'since' timestamp")
+
 @router.get("/", response_model=LogsResponse)
 def fetch_logs(limit: int = Query(50, ge=1, le=1000),
                type_: Optional[str] = Query(None, alias="type"),
                types: Optional[List[str]] = Query(None, alias="types"),
-               since: Optional[str] = None):
+               since: Optional[str] = None,
+               after_id: Optional[int] = Query(None, ge=0),
+               before_id: Optional[int] = Query(None, ge=0)):
+    levels = _validate_types(type_, types)
+    logs = get_logs(limit=limit, types=levels, since=_parse_since(since), after_id=after_id, before_id=before_id)
+    return LogsResponse(logs=logs, count=len(logs),
+                        next_before_id=logs[0]["id"] if logs else before_id,
+                        next_after_id=logs[-1]["id"] if logs else after_id)
+
+class SearchResponse(BaseModel):
+    ids: List[int]
+    logs: List[LogEntryOut]
+    count: int
+
+@router.get("/search", response_model=SearchResponse)
+def search(q: str = Query(..., min_length=1),
+           limit: int = Query(50, ge=1, le=1000),
+           type_: Optional[str] = Query(None, alias="type"),
+           types: Optional[List[str]] = Query(None, alias="types"),
+           since: Optional[str] = None,
+           until: Optional[str] = None):
+    """AND search over message and context tokens (wallets, subscription and session ids)."""
     levels = _validate_types(type_, types)
-    since_dt = None
-    if since:
-        try: since_dt = datetime.fromisoformat(since)
-        except Exception: raise HTTPException(422, detail="Invalid 'since' timestamp")
-    logs = get_logs(limit=limit, types=levels, since=since_dt)
-    return LogsResponse(logs=logs, count=len(logs))
+    logs = search_logs(q, limit=limit, types=levels, since=_parse_since(since), until=_parse_since(until))
+    return SearchResponse(ids=[e["id"] for e in logs], logs=logs, count=len(logs))
+
+@router.get("/export")
+def export_logs(type_: Optional[str] = Query(None, alias="type"),
+                types: Optional[List[str]] = Query(None, alias="types"),
+                since: Optional[str] = None,
+                after_id: Optional[int] = Query(None, ge=0),
+                before_id: Optional[int] = Query(None, ge=0)):
+    """Stream the audit trail as NDJSON, oldest first, without materializing it."""
+    levels = _validate_types(type_, types)
+    rows = iter_logs(types=levels, since=_parse_since(since), after_id=after_id, before_id=before_id)
+    lines = (json.dumps(e, default=str) + "\n" for e in rows)
+    return StreamingResponse(lines, media_type="application/x-ndjson",
+                             headers={"Content-Disposition": "attachment; filename=audit_logs.ndjson"})
+
+@router.get("/stream")
+async def stream_logs(request: Request,
+                      type_: Optional[str] = Query(None, alias="type"),
+                      types: Optional[List[str]] = Query(None, alias="types"),
+                      after_id: Optional[int] = None,
+                      last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")):
+    """Server-sent events for new log entries; resumes after Last-Event-ID (or ?after_id=)."""
+    levels = _validate_types(type_, types)
+    want = {l.value for l in levels} if levels else None
+    last_id = parse_last_event_id(last_event_id)
+    if last_id is None: last_id = after_id
+    events = sse_stream(
+        request, log_stream,
+        backlog=lambda after: get_logs(limit=500, types=levels, after_id=after),
+        matches=lambda e: want is None or e.get("type") in want,
+        last_id=last_id, event="log",
+    )
+    return StreamingResponse(events, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.get("/stats")
+def stats():
+    return get_log_stats()
 
 @router.delete("/")
 def clear():
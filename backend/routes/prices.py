@@ -1,22 +1,61 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
 import httpx
-import os, time, logging
+import os, logging
+from backend.services import http_client
+from backend.services.crypto_service import coin_id as resolve_coin_id, get_prices
+from backend.services.price_cache import prices as price_cache
+from backend.services.single_flight import flights
 
 router = APIRouter(tags=["prices"])
 
 COINGECKO = "https://api.coingecko.com/api/v3/simple/price"
-CACHE = {}
-CACHE_TTL = 60  # seconds
 
 MOCK_MODE = os.getenv("MOCK_PRICES", "false").lower() == "true"
 logger = logging.getLogger(__name__)
 
+async def _fetch_usd(coin_id: str):
+    async def fetch():
+        r = await http_client.get_async_client().get(
+            COINGECKO, params={"ids": coin_id, "vs_currencies": "usd"}, timeout=5.0)
+        r.raise_for_status()
+        data = r.json()
+        return data.get(coin_id, {}).get("usd")
+    # Concurrent misses for the same coin share one CoinGecko request
+    return await flights.ado(("coingecko", coin_id), fetch)
+
+
+MAX_SYMBOLS = 250
+
+
+@router.get("")
+@router.get("/", include_in_schema=False)
+def get_many(symbols: str = Query(..., description="Comma-separated symbols, e.g. ETH,BTC,SOL")):
+    """Prices for many symbols; all uncached ones are fetched in one CoinGecko request."""
+    syms = list(dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip()))
+    if not syms:
+        raise HTTPException(400, "symbols is required")
+    if len(syms) > MAX_SYMBOLS:
+        raise HTTPException(400, f"At most {MAX_SYMBOLS} symbols per request")
+
+    if MOCK_MODE:
+        mock_prices = {"ETH": 2780.55, "USDC": 1.00}
+        res = {s: {"symbol": s, "price": mock_prices.get(s, 100.0), "currency": "USD",
+                   "note": "mock price (MOCK_PRICES=true)"} for s in syms}
+    else:
+        res = get_prices(syms)
+    found = {s: r for s, r in res.items() if r}
+    return {"prices": found, "count": len(found), "missing": [s for s in syms if s not in found]}
+
+
+@router.get("/cache/stats")
+def cache_stats():
+    return price_cache.stats()
+
+
 @router.get("/{symbol}")
 async def get_price(symbol: str):
     symbol = (symbol or "").lower()
-    mapping = {"eth": "ethereum", "usdc": "usd-coin"}
-    coin_id = mapping.get(symbol, symbol)
-    now = time.time()
 
     # 🎭 Mock mode (fixed demo prices)
     if MOCK_MODE:
@@ -28,25 +67,20 @@ async def get_price(symbol: str):
             "note": "mock price (MOCK_PRICES=true)"
         }
 
-    # 💾 Cache
-    if coin_id in CACHE:
-        ts, data = CACHE[coin_id]
-        if now - ts < CACHE_TTL:
-            logger.info(f"💾 Serving {symbol.upper()} price from cache")
-            return data
+    # Same symbol -> id resolution as get_many (the coin list may be fetched on first use);
+    # anything unresolved is tried as a CoinGecko id, e.g. /api/price/bitcoin
+    coin_id = await run_in_threadpool(resolve_coin_id, symbol) or symbol
 
-    # 🌍 Fetch from CoinGecko
+    # 💾 Shared cache (fresh, or stale while a background refresh runs), else 🌍 CoinGecko
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            r = await client.get(COINGECKO, params={"ids": coin_id, "vs_currencies": "usd"})
-            r.raise_for_status()
-            data = r.json()
+        price = await price_cache.aget(coin_id, lambda: _fetch_usd(coin_id))
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 429:  # Too many requests
             logger.warning(f"⚠️ Rate-limited by CoinGecko for {symbol.upper()}")
-            if coin_id in CACHE:
-                _, cached = CACHE[coin_id]
-                return {**cached, "note": "⚠️ stale cached value (CoinGecko 429)"}
+            cached = price_cache.peek(coin_id)
+            if cached:
+                return {"symbol": symbol.upper(), "price": cached[0], "currency": "USD",
+                        "note": "⚠️ stale cached value (CoinGecko 429)"}
             # fallback hardcoded
             return {
                 "symbol": symbol.upper(),
@@ -57,9 +91,10 @@ async def get_price(symbol: str):
         raise HTTPException(e.response.status_code, f"CoinGecko error: {e}")
     except Exception as e:
         logger.error(f"❌ Price fetch failed for {symbol.upper()}: {e}")
-        if coin_id in CACHE:
-            _, cached = CACHE[coin_id]
-            return {**cached, "note": "⚠️ stale cached value (fetch error)"}
+        cached = price_cache.peek(coin_id)
+        if cached:
+            return {"symbol": symbol.upper(), "price": cached[0], "currency": "USD",
+                    "note": "⚠️ stale cached value (fetch error)"}
         # fallback demo
         return {
             "symbol": symbol.upper(),
@@ -69,14 +104,11 @@ async def get_price(symbol: str):
         }
 
     # ✅ Validate
-    if coin_id not in data or "usd" not in data[coin_id]:
+    if price is None:
         raise HTTPException(404, f"Price for {symbol.upper()} not found")
 
-    result = {
+    return {
         "symbol": symbol.upper(),
-        "price": data[coin_id]["usd"],
+        "price": price,
         "currency": "USD",
     }
-    CACHE[coin_id] = (now, result)
-    logger.info(f"✅ Updated {symbol.upper()} price: {result['price']}")
-    return result
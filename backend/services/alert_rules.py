@@ -0,0 +1,179 @@
+# backend/services/alert_rules.py
+"""
+Declarative alert rules evaluated in one vectorized pass.
+
+A rule says "raise <level> alert when <metric> <op> <threshold>" for every
+subject in a scope (wallet, symbol, user). Collectors fill a MetricsSnapshot;
+`evaluate()` turns each (scope, metric) column into a NumPy array and
+compares it against the thresholds of all rules on that column at once, so
+only the hits cost Python work. Missing metrics are NaN and never match.
+
+Rules come from ALERT_RULES_FILE (a JSON list of rule objects) when set,
+otherwise DEFAULT_RULES, which reproduce the original hardcoded checks.
+"""
+from __future__ import annotations
+import json
+import math
+import os
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SCOPES = ("wallet", "symbol", "user")
+OPS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+
+@dataclass(frozen=True)
+class Rule:
+    id: str
+    scope: str
+    metric: str
+    op: str
+    threshold: float
+    level: str = "warning"
+    type: str = "crypto"
+    message: str = "{label} {metric} {op} {threshold:g} (current: {value:g})"
+    subjects: Tuple[str, ...] = ()      # empty = every subject in the scope
+    context: Tuple[str, ...] = ()       # snapshot extras copied into the alert context
+    cooldown: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, object]) -> "Rule":
+        d = dict(d)
+        for k in ("subjects", "context"):
+            d[k] = tuple(d.get(k) or ())
+        rule = cls(**d)
+        if rule.scope not in SCOPES:
+            raise ValueError(f"Rule {rule.id}: unknown scope {rule.scope!r}")
+        if rule.op not in OPS:
+            raise ValueError(f"Rule {rule.id}: unknown comparator {rule.op!r}")
+        return rule
+
+    def to_dict(self) -> Dict[str, object]:
+        d = asdict(self)
+        d["subjects"], d["context"] = list(self.subjects), list(self.context)
+        return d
+
+
+DEFAULT_RULES: List[Rule] = [
+    Rule("btc_above_70k", "symbol", "price", ">", 70_000, level="info",
+         message="{subject} crossed $70K! Current: {value:.2f}", subjects=("BTC",), cooldown=3600),
+    Rule("wallet_eth_low", "wallet", "eth", "<", 0.01, message="{label} ETH critically low"),
+    Rule("wallet_usdc_low", "wallet", "usdc", "<", 10, message="{label} USDC low"),
+    Rule("subscription_canceled", "user", "canceled", "==", 1, level="error", type="subscription",
+         message="{subject} subscription cancelled"),
+    Rule("subscription_paused", "user", "paused", "==", 1, type="subscription",
+         message="{subject} subscription paused"),
+    Rule("subscription_expiring", "user", "renews_in_days", "<", 3, type="subscription",
+         message="{subject} subscription expiring soon ({renews_date})", context=("renews_on",)),
+]
+
+
+class MetricsSnapshot:
+    """Thread-safe collector: scope -> subject -> metric values, plus labels and extras for messages."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: Dict[str, Dict[str, Dict[str, float]]] = {s: {} for s in SCOPES}
+        self._extra: Dict[str, Dict[str, Dict[str, object]]] = {s: {} for s in SCOPES}
+
+    def set(self, scope: str, subject: str, extra: Optional[Dict[str, object]] = None, **metrics: float):
+        with self._lock:
+            row = self._rows[scope].setdefault(subject, {})
+            row.update({k: float(v) for k, v in metrics.items() if v is not None})
+            if extra:
+                self._extra[scope].setdefault(subject, {}).update(extra)
+
+    def subjects(self, scope: str) -> List[str]:
+        return list(self._rows[scope])
+
+    def extra(self, scope: str, subject: str) -> Dict[str, object]:
+        return self._extra[scope].get(subject, {})
+
+    def columns(self, scope: str, metrics: Sequence[str]) -> Tuple[List[str], Dict[str, np.ndarray]]:
+        """Subjects of a scope and one float array per metric (NaN where missing)."""
+        with self._lock:
+            subjects = list(self._rows[scope])
+            rows = [self._rows[scope][s] for s in subjects]
+        nan = math.nan
+        return subjects, {m: np.fromiter((r.get(m, nan) for r in rows), dtype=float, count=len(rows)) for m in metrics}
+
+
+def evaluate(rules: Sequence[Rule], snapshot: MetricsSnapshot) -> List[Tuple[Rule, str, float]]:
+    """All (rule, subject, value) hits, in rule order then subject order."""
+    hits: List[Tuple[int, int, Rule, str, float]] = []
+    for scope in SCOPES:
+        scoped = [(i, r) for i, r in enumerate(rules) if r.scope == scope]
+        if not scoped:
+            continue
+        subjects, cols = snapshot.columns(scope, sorted({r.metric for _, r in scoped}))
+        if not subjects:
+            continue
+        names = np.array(subjects, dtype=object)
+        # One broadcast comparison per (metric, comparator): thresholds (k,1) vs values (1,n)
+        groups: Dict[Tuple[str, str], List[Tuple[int, Rule]]] = {}
+        for i, r in scoped:
+            groups.setdefault((r.metric, r.op), []).append((i, r))
+        for (metric, op), members in groups.items():
+            values = cols[metric]
+            thresholds = np.array([r.threshold for _, r in members], dtype=float)[:, None]
+            mask = OPS[op](values[None, :], thresholds) & ~np.isnan(values)[None, :]
+            for k, (_, r) in enumerate(members):
+                if r.subjects:
+                    mask[k] &= np.isin(names, r.subjects)
+            for k, j in zip(*np.nonzero(mask)):
+                i, r = members[k]
+                hits.append((i, j, r, subjects[j], float(values[j])))
+    hits.sort(key=lambda h: (h[0], h[1]))
+    return [(r, s, v) for _, _, r, s, v in hits]
+
+
+def render(rule: Rule, subject: str, value: float, snapshot: MetricsSnapshot) -> Tuple[str, Dict[str, object]]:
+    """Alert message and context for one hit."""
+    extra = snapshot.extra(rule.scope, subject)
+    fields = {"label": subject, **extra, "subject": subject, "value": value,
+              "threshold": rule.threshold, "metric": rule.metric, "op": rule.op}
+    ctx = {} if rule.scope == "symbol" else {rule.scope: subject}
+    ctx.update({k: extra[k] for k in rule.context if k in extra})
+    return rule.message.format(**fields), ctx
+
+
+# --- Registry ---
+ALERT_RULES_FILE = os.getenv("ALERT_RULES_FILE")
+_rules: Optional[List[Rule]] = None
+
+
+def load_rules(path: Optional[str] = None) -> List[Rule]:
+    path = path or ALERT_RULES_FILE
+    if not path:
+        return list(DEFAULT_RULES)
+    try:
+        raw = json.loads(Path(path).read_text(encoding="utf-8"))
+        return [Rule.from_dict(d) for d in (raw.get("rules", []) if isinstance(raw, dict) else raw)]
+    except Exception as e:
+        print(f"❌ Failed to load alert rules from {path}: {e}; using defaults")
+        return list(DEFAULT_RULES)
+
+
+def get_rules() -> List[Rule]:
+    global _rules
+    if _rules is None:
+        _rules = load_rules()
+    return _rules
+
+
+def set_rules(rules: Optional[Sequence[Rule]] = None) -> List[Rule]:
+    """Replace the active rules (None reloads from config)."""
+    global _rules
+    _rules = list(rules) if rules is not None else load_rules()
+    return _rules
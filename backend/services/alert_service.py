@@ -1,16 +1,43 @@
 from __future__ import annotations
-from collections import deque
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Deque, Dict, List, Optional, Sequence
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
 
 import backend.services.crypto_service as crypto_service
+from backend.services.alert_rules import MetricsSnapshot, Rule, evaluate, get_rules, render
+from backend.services.live_tail import Broadcaster
 from backend.services.log_service import add_log
+from backend.services.recommendations import action_bundle, message_template, plans_for
 from backend.services.subscriptions_service import get_subscription_status
+from backend.services.watchlist_service import get_watchlist
 
 # Config
 DEMO_WALLET = "0x9ba79e76F4d1B06fA48855DC34e3D6E7bb1BED2B"
-_alerts: Deque[Dict[str, object]] = deque(maxlen=200)
+ALERT_MAX_ENTRIES = int(os.getenv("ALERT_MAX_ENTRIES", "200"))
+# Ids come from a monotonic counter; blocks of ids are reserved in this file so they survive restarts
+ALERT_ID_FILE = Path(os.getenv("ALERT_ID_FILE", Path(__file__).resolve().parents[2] / "alert_ids.json"))
+_ID_BLOCK = 100
+
+# Ring buffer: id -> alert in id order (oldest first); O(1) lookup, resolve and eviction
+_alerts: "OrderedDict[int, Dict[str, object]]" = OrderedDict()
+# Secondary index rings: level / type -> ids in id order, maintained alongside _alerts
+_by_level: Dict[str, "OrderedDict[int, None]"] = {}
+_by_type: Dict[str, "OrderedDict[int, None]"] = {}
+_lock = threading.RLock()
+# New alerts are pushed to SSE subscribers of /api/alerts/stream
+alert_stream = Broadcaster()
+
+# Dedup: a repeat of an active alert (same fingerprint) within its cooldown only bumps count/last_seen
+ALERT_COOLDOWN_SECONDS = float(os.getenv("ALERT_COOLDOWN_SECONDS", "900"))
+_active: Dict[str, Dict[str, object]] = {}  # fingerprint -> alert
 
 
 # --- Enums ---
@@ -30,145 +57,373 @@ def _now() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
+# Context keys naming the alert's subject; their values are part of its identity
+_SUBJECT_KEYS = ("wallet", "user")
+
+
+def fingerprint(msg: str, atype: str, ctx: Optional[dict] = None) -> str:
+    """Stable identity of an alert condition: type, message template, context keys and subject."""
+    ctx = ctx or {}
+    subject = ",".join(f"{k}={ctx[k]}" for k in _SUBJECT_KEYS if k in ctx)
+    raw = "|".join([atype, message_template(msg), ",".join(sorted(ctx)), subject])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _load_id_ceiling() -> int:
+    try:
+        return max(1, int(json.loads(ALERT_ID_FILE.read_text()).get("next_id", 1)))
+    except Exception:
+        return 1
+
+
+_next_id = _reserved = _load_id_ceiling()
+
+
+def _new_id() -> int:
+    """Next alert id; persists a new reservation ceiling once per _ID_BLOCK ids."""
+    global _next_id, _reserved
+    if _next_id >= _reserved:
+        _reserved = _next_id + _ID_BLOCK
+        try:
+            ALERT_ID_FILE.parent.mkdir(parents=True, exist_ok=True)
+            tmp = ALERT_ID_FILE.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"next_id": _reserved}))
+            tmp.replace(ALERT_ID_FILE)
+        except Exception as e:
+            print(f"❌ Failed to persist alert id block: {e}")
+    aid, _next_id = _next_id, _next_id + 1
+    return aid
+
+
+def reserve_id() -> int:
+    """An id from the persisted alert sequence, for alerts kept outside this store (tx confirmations)."""
+    with _lock:
+        return _new_id()
+
+
+def _forget(alert: Dict[str, object]):
+    fp = alert.get("fingerprint")
+    if _active.get(fp) is alert:
+        del _active[fp]
+
+
+def _store(alert: Dict[str, object]):
+    aid = alert["id"]
+    _alerts[aid] = alert
+    _by_level.setdefault(alert["level"], OrderedDict())[aid] = None
+    _by_type.setdefault(alert["type"], OrderedDict())[aid] = None
+
+
+def _drop(alert_id: int) -> Optional[Dict[str, object]]:
+    alert = _alerts.pop(alert_id, None)
+    if alert is not None:
+        _forget(alert)
+        _by_level.get(alert["level"], {}).pop(alert_id, None)
+        _by_type.get(alert["type"], {}).pop(alert_id, None)
+    return alert
+
+
 # --- Core API ---
 def add_alert(
     msg: str,
     level: AlertLevel | str = AlertLevel.WARNING,
     ctx: Optional[dict] = None,
     atype: AlertType | str = AlertType.CRYPTO,
+    cooldown: Optional[float] = None,
 ):
+    """
+    Raise an alert. If an alert with the same fingerprint is still active and
+    was last seen within `cooldown` seconds (default ALERT_COOLDOWN_SECONDS),
+    only its `count`/`last_seen` are bumped and the existing alert is returned.
+    """
     lvl = AlertLevel(level) if isinstance(level, str) else level
     t = AlertType(atype) if isinstance(atype, str) else atype
-    alert = {
-        "id": len(_alerts) + 1,
-        "level": lvl.value,
-        "type": t.value,
-        "message": msg,
-        "timestamp": _now(),
-    }
-    if ctx:
-        alert["context"] = ctx
-    _alerts.append(alert)
+    fp = fingerprint(msg, t.value, ctx)
+    now = time.time()
+    window = ALERT_COOLDOWN_SECONDS if cooldown is None else cooldown
+
+    with _lock:
+        prev = _active.get(fp)
+        if prev is not None and now - float(prev["last_seen_ts"]) <= window:
+            prev["count"] = int(prev["count"]) + 1
+            prev["last_seen"], prev["last_seen_ts"] = _now(), now
+            if msg != prev["message"]:
+                prev["last_message"] = msg
+            if ctx:
+                prev["context"] = ctx
+            return prev
+
+        alert = {
+            "id": _new_id(),
+            "level": lvl.value,
+            "type": t.value,
+            "message": msg,
+            "timestamp": _now(),
+            "fingerprint": fp,
+            "count": 1,
+            "last_seen": _now(),
+            "last_seen_ts": now,
+        }
+        if ctx:
+            alert["context"] = ctx
+        if prev is not None:
+            _forget(prev)
+        _store(alert)
+        _active[fp] = alert
+        while len(_alerts) > ALERT_MAX_ENTRIES:
+            _drop(next(iter(_alerts)))
+        alert_stream.publish(alert)
     add_log(lvl.value, f"ALERT [{t.value.upper()}]: {msg}")
     return alert
 
 
-def get_alerts(limit: int = 20, level: Optional[str] = None, atype: Optional[str] = None) -> List[Dict]:
-    results = list(_alerts)
-    if level:
-        results = [a for a in results if a["level"] == level]
-    if atype:
-        results = [a for a in results if a["type"] == atype]
-    return results[-limit:]
+def _fire(*args, **kwargs) -> int:
+    """add_alert for the checkers: 1 if a new alert was raised, 0 for a deduplicated repeat."""
+    return int(add_alert(*args, **kwargs)["count"] == 1)
+
+
+def get_alerts(
+    limit: int = 20, level: Optional[str] = None, atype: Optional[str] = None, after_id: Optional[int] = None
+) -> List[Dict]:
+    """Newest `limit` alerts, or with `after_id` the oldest `limit` alerts after that id."""
+    if limit <= 0:
+        return []
+    with _lock:
+        # Walk the smallest candidate ring newest-first; only the matching tail is touched
+        rings = [_alerts]
+        if level:
+            rings.append(_by_level.get(level, {}))
+        if atype:
+            rings.append(_by_type.get(atype, {}))
+        ring = min(rings, key=len)
+        out: List[Dict] = []
+        for aid in reversed(ring):
+            if after_id is not None and aid <= after_id:
+                break
+            alert = _alerts[aid]
+            if (level and alert["level"] != level) or (atype and alert["type"] != atype):
+                continue
+            out.append(alert)
+            if after_id is None and len(out) >= limit:
+                break
+    out.reverse()
+    return out[:limit]
+
+
+def get_alert(alert_id: int) -> Optional[Dict]:
+    return _alerts.get(alert_id)
 
 
 def clear_alerts():
-    _alerts.clear()
+    with _lock:
+        _alerts.clear()
+        _active.clear()
+        _by_level.clear()
+        _by_type.clear()
 
 
 def resolve_alert(alert_id: int) -> bool:
     """Resolve (remove) a single alert by ID."""
-    for alert in list(_alerts):
-        if alert.get("id") == alert_id:
-            try:
-                _alerts.remove(alert)
-                add_log("info", f"Resolved alert {alert.get('message')}")
-                return True
-            except ValueError:
-                pass
-    return False
+    with _lock:
+        alert = _drop(alert_id)
+    if alert is None:
+        return False
+    add_log("info", f"Resolved alert {alert.get('message')}")
+    return True
+
+
+def acknowledge_alert(alert_id: int) -> Optional[Dict]:
+    """Mark an alert as acknowledged without removing it."""
+    with _lock:
+        alert = _alerts.get(alert_id)
+        if alert is None:
+            return None
+        if not alert.get("acknowledged"):
+            alert["acknowledged"], alert["acknowledged_at"] = True, _now()
+    add_log("action", f"Acknowledged alert {alert.get('message')}")
+    return alert
 
 
 # --- Checkers ---
-def check_crypto_alerts() -> int:
-    count = 0
+# --- Metric collectors ---
+# Collectors only gather numbers into a MetricsSnapshot; thresholds live in alert_rules and are
+# evaluated for every subject at once. Collection failures are still reported as alerts here.
+def _collect_btc(snap: MetricsSnapshot) -> int:
     try:
         btc = crypto_service.get_price("BTC")
         price = float(btc["price"]) if btc and "price" in btc else None
-        if price and price > 70_000:
-            add_alert(f"BTC crossed $70K! Current: {price:.2f}", AlertLevel.INFO, atype=AlertType.CRYPTO)
-            count += 1
+        snap.set("symbol", "BTC", price=price)
     except Exception as e:
-        add_alert(f"Error fetching BTC price: {e}", AlertLevel.ERROR, atype=AlertType.CRYPTO)
-        count += 1
+        return _fire(f"Error fetching BTC price: {e}", AlertLevel.ERROR, atype=AlertType.CRYPTO)
+    return 0
+
 
+def _collect_wallets(snap: MetricsSnapshot) -> int:
+    """Demo wallet plus the persisted watchlist, fetched in batched RPC calls."""
+    labels = {DEMO_WALLET: "Demo wallet"}
+    for w in get_watchlist():
+        if str(w["address"]).lower() != DEMO_WALLET.lower():
+            labels[str(w["address"])] = str(w.get("label") or w["address"])
     try:
-        bal = crypto_service.get_balance(DEMO_WALLET)
-        eth, usdc = float(bal.get("eth", 0)), float(bal.get("usdc", 0))
-        if eth < 0.01:
-            add_alert("Demo wallet ETH critically low", AlertLevel.WARNING, {"wallet": DEMO_WALLET}, AlertType.CRYPTO)
-            count += 1
-        if usdc < 10:
-            add_alert("Demo wallet USDC low", AlertLevel.WARNING, {"wallet": DEMO_WALLET}, AlertType.CRYPTO)
-            count += 1
+        balances = crypto_service.get_balances(list(labels))
     except Exception as e:
-        add_alert(f"Error checking demo wallet: {e}", AlertLevel.ERROR, atype=AlertType.CRYPTO)
-        count += 1
+        return _fire(f"Error checking demo wallet: {e}", AlertLevel.ERROR, atype=AlertType.CRYPTO)
+    count = 0
+    for addr, label in labels.items():
+        bal = balances.get(addr) or {"error": "no result"}
+        if "error" in bal:
+            who = "demo wallet" if addr == DEMO_WALLET else f"wallet {label}"
+            count += _fire(f"Error checking {who}: {bal['error']}", AlertLevel.ERROR, {"wallet": addr}, AlertType.CRYPTO)
+            continue
+        snap.set("wallet", addr, {"label": label}, eth=float(bal.get("eth", 0)), usdc=float(bal.get("usdc", 0)))
     return count
 
 
-def check_subscription_alerts(users: Sequence[str] = ("user1", "user2", "user3")) -> int:
+def _collect_subscription(u: str, snap: MetricsSnapshot) -> int:
+    try:
+        s = get_subscription_status(u) or {}
+        state, renew = str(s.get("status", "")).lower(), s.get("renews_on")
+        snap.set("user", u, canceled=state == "canceled", paused=state == "paused")
+        if renew:
+            try:
+                dt = datetime.fromisoformat(str(renew))
+                snap.set("user", u, {"renews_on": dt.isoformat(), "renews_date": str(dt.date())},
+                         renews_in_days=(dt - datetime.now()) / timedelta(days=1))
+            except Exception:
+                pass
+    except Exception as e:
+        return _fire(f"Error checking subscription for {u}: {e}", AlertLevel.ERROR, {"user": u}, AlertType.SUBSCRIPTION)
+    return 0
+
+
+def apply_rules(snap: MetricsSnapshot, rules: Optional[Sequence[Rule]] = None) -> int:
+    """Evaluate the rule set against a snapshot and raise an alert per hit."""
     count = 0
-    for u in users:
-        try:
-            s = get_subscription_status(u) or {}
-            state, renew = s.get("status", ""), s.get("renews_on")
-            if state.lower() == "canceled":
-                add_alert(f"{u} subscription cancelled", AlertLevel.ERROR, {"user": u}, AlertType.SUBSCRIPTION)
-                count += 1
-            if state.lower() == "paused":
-                add_alert(f"{u} subscription paused", AlertLevel.WARNING, {"user": u}, AlertType.SUBSCRIPTION)
-                count += 1
-            if renew:
-                try:
-                    dt = datetime.fromisoformat(str(renew))
-                    if dt - datetime.now() < timedelta(days=3):
-                        add_alert(
-                            f"{u} subscription expiring soon ({dt.date()})",
-                            AlertLevel.WARNING,
-                            {"user": u, "renews_on": dt.isoformat()},
-                            AlertType.SUBSCRIPTION,
-                        )
-                        count += 1
-                except Exception:
-                    pass
-        except Exception as e:
-            add_alert(f"Error checking subscription for {u}: {e}", AlertLevel.ERROR, {"user": u}, AlertType.SUBSCRIPTION)
-            count += 1
+    for rule, subject, value in evaluate(get_rules() if rules is None else rules, snap):
+        msg, ctx = render(rule, subject, value, snap)
+        count += _fire(msg, rule.level, ctx or None, rule.type, cooldown=rule.cooldown)
     return count
 
 
+def check_crypto_alerts() -> int:
+    snap = MetricsSnapshot()
+    errors = _collect_btc(snap) + _collect_wallets(snap)
+    return errors + apply_rules(snap, [r for r in get_rules() if r.scope != "user"])
+
+
+def check_subscription_alerts(users: Sequence[str] = ("user1", "user2", "user3")) -> int:
+    snap = MetricsSnapshot()
+    errors = sum(_collect_subscription(u, snap) for u in users)
+    return errors + apply_rules(snap, [r for r in get_rules() if r.scope == "user"])
+
+
+# --- Concurrent checks ---
+# Each check runs on a bounded pool and gets its own deadline, counted from when it starts.
+# A check past its deadline is reported as timed out and the tick returns without it;
+# checks still queued when the tick budget runs out are cancelled.
+ALERT_CHECK_WORKERS = int(os.getenv("ALERT_CHECK_WORKERS", "16"))
+ALERT_CHECK_TIMEOUT = float(os.getenv("ALERT_CHECK_TIMEOUT", "10"))
+ALERT_CHECK_BUDGET = float(os.getenv("ALERT_CHECK_BUDGET", "25"))
+_pool: Optional[ThreadPoolExecutor] = None
+_last_run: Dict[str, object] = {}
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=max(1, ALERT_CHECK_WORKERS), thread_name_prefix="alert-check")
+        return _pool
+
+
+def run_checks(checks: Dict[str, Callable[[], int]], timeout: Optional[float] = None,
+               budget: Optional[float] = None) -> Dict[str, object]:
+    """Run named checks concurrently; returns counts for the ones that finished in time."""
+    timeout = ALERT_CHECK_TIMEOUT if timeout is None else timeout
+    budget = ALERT_CHECK_BUDGET if budget is None else budget
+    t0 = time.monotonic()
+    started: Dict[str, float] = {}
+
+    def run(name: str, fn: Callable[[], int]) -> int:
+        started[name] = time.monotonic()
+        return fn()
+
+    pending = {_executor().submit(run, name, fn): name for name, fn in checks.items()}
+    results: Dict[str, int] = {}
+    errors: Dict[str, str] = {}
+    timed_out: List[str] = []
+    skipped: List[str] = []
+    while pending:
+        now = time.monotonic()
+        deadlines = [started[n] + timeout for n in pending.values() if n in started]
+        wake = min(deadlines + [t0 + budget]) - now
+        done, _ = wait(pending, timeout=max(0.0, min(wake, 0.05)), return_when=FIRST_COMPLETED)
+        for fut in done:
+            name = pending.pop(fut)
+            try:
+                results[name] = int(fut.result() or 0)
+            except Exception as e:
+                errors[name] = str(e)
+        now = time.monotonic()
+        for fut, name in list(pending.items()):
+            if name in started and now - started[name] >= timeout:
+                timed_out.append(name)
+                del pending[fut]
+            elif now - t0 >= budget:
+                (skipped if fut.cancel() else timed_out).append(name)
+                del pending[fut]
+
+    for name in timed_out:
+        _fire(f"Alert check {name} timed out after {timeout:g}s", AlertLevel.WARNING, {"check": name})
+    report = {
+        "checks": len(checks),
+        "completed": len(results),
+        "alerts": sum(results.values()),
+        "timed_out": sorted(timed_out),
+        "skipped": sorted(skipped),
+        "errors": errors,
+        "wall_ms": round((time.monotonic() - t0) * 1000, 1),
+        "finished_at": _now(),
+    }
+    _last_run.clear()
+    _last_run.update(report)
+    return report
+
+
 def check_alerts(users: Sequence[str] = ("user1", "user2", "user3")) -> int:
-    return check_crypto_alerts() + check_subscription_alerts(users)
+    """
+    One alert tick: collectors (crypto and one per user) run concurrently into a shared
+    snapshot, then every rule is evaluated against whatever was collected in time.
+    """
+    snap = MetricsSnapshot()
+    checks: Dict[str, Callable[[], int]] = {
+        "btc_price": lambda: _collect_btc(snap),
+        "wallets": lambda: _collect_wallets(snap),
+    }
+    for u in users:
+        checks[f"subscription:{u}"] = lambda u=u: _collect_subscription(u, snap)
+    report = run_checks(checks)
+    if report["timed_out"] or report["skipped"]:
+        add_log("warning", f"Alert check partial: {report['completed']}/{report['checks']} checks finished",
+                {"timed_out": report["timed_out"], "skipped": report["skipped"]})
+    return int(report["alerts"]) + apply_rules(snap)
     # Circle removed
 
 
+def get_check_stats() -> Dict[str, object]:
+    """Summary of the most recent check_alerts tick."""
+    return dict(_last_run)
+
+
 # --- Recommendations & Plans ---
 def recommend_action(alert: Dict) -> List[str]:
     """Return recommended actions for an alert message."""
-    msg = alert.get("message", "").lower()
-    if "usdc low" in msg:
-        return ["Top up USDC manually", "Transfer from backup wallet"]
-    if "eth critically low" in msg:
-        return ["Fund ETH from faucet", "Transfer ETH from backup"]
-    if "subscription cancelled" in msg:
-        return ["Resume subscription", "Downgrade to Free plan"]
-    if "subscription expiring" in msg:
-        return ["Renew subscription now", "Switch to monthly plan"]
-    return ["Investigate issue manually"]
+    return list(action_bundle(message_template(alert.get("message", ""))))
 
 
 def build_plans(alert: Dict) -> List[Dict]:
-    """Return multiple structured plans for Portia to consider."""
-    recs = recommend_action(alert)
-    return [
-        {
-            "option": f"Plan {i}",
-            "recommendation": r,
-            "steps": [{"tool": "ask_agent", "args": {"query": r}}],
-        }
-        for i, r in enumerate(recs, start=1)
-    ]
+    """Return multiple structured plans for Portia to consider (a fresh list per call)."""
+    return plans_for(action_bundle(message_template(alert.get("message", ""))))
 
 
 # --- Demo Events for Presentation ---
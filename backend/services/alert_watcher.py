@@ -1,66 +1,98 @@
 # backend/services/alert_watcher.py
 
 import asyncio
+import os
 import threading
+import time
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict
+from itertools import islice
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set
 
-from backend.services import alert_service, crypto_service
+from backend.services import alert_service
+from backend.services.crypto_service import EXPLORER
+from backend.services.tx_tracker import tracker as tx_tracker
+from backend.services.recommendations import advisor_bundle, message_template, summarize
 
-# Buffer of enriched recent alerts (max 100)
-_recent_alerts: deque[Dict] = deque(maxlen=100)
-
-# Track pending tx hashes
-_pending_txs: set[str] = set()
+# Buffer of enriched recent alerts; _recent_keys mirrors its contents for O(1) dedup
+ALERT_WATCHER_RECENT = int(os.getenv("ALERT_WATCHER_RECENT", "100"))
+_recent_alerts: deque[Dict] = deque(maxlen=max(1, ALERT_WATCHER_RECENT))
+_recent_keys: Set[Hashable] = set()
 
 # Lock for thread safety
 _lock = threading.Lock()
 
+# Blocking calls (CoinGecko, Web3, Stripe) run on this pool so the event loop stays responsive
+WATCHER_WORKERS = int(os.getenv("WATCHER_WORKERS", "4"))
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+_executor: Optional[ThreadPoolExecutor] = None
+_tasks: List[asyncio.Task] = []
+_stats: Dict[str, Any] = {
+    "ticks": 0, "errors": 0, "last_check_ms": None, "max_check_ms": 0.0,
+    "lag_samples": 0, "lag_last_ms": 0.0, "lag_max_ms": 0.0, "lag_avg_ms": 0.0,
+}
+
 
 def _advisor_style_enrichment(alert: Dict) -> Dict:
-    """Advisor-style enrichment with reasoning + plans."""
-    msg = alert.get("message", "").lower()
-
-    if "btc crossed" in msg or "eth price" in msg or "dropped" in msg:
-        alert["recommendations"] = [
-            "✋ Hold position — Ride out short-term volatility.",
-            "💱 Sell 30% to USDC — Reduce exposure while keeping upside.",
-            "💸 Cash out to PayPal — Fully hedge by moving to fiat."
-        ]
+    """Advisor-style enrichment with reasoning + plans (memoized per message template)."""
+    bundle = advisor_bundle(message_template(alert.get("message", "")))
+    if bundle is not None:
+        recs, actions = bundle
+        alert["recommendations"] = list(recs)
+    elif "recommendations" in alert:
+        actions = summarize(alert["recommendations"])
 
-    elif "wallet" in msg and "low" in msg:
-        alert["recommendations"] = [
-            "🟡 Mint 50 USDC via Circle — Restores balance above $50.",
-            "🔀 Transfer from backup wallet — Avoid minting fees."
-        ]
+    # Attach summary
+    if "recommendations" in alert:
+        alert["summary"] = f"⚠️ {alert['message']} Suggested actions: {actions}"
 
-    elif "subscription" in msg:
-        alert["recommendations"] = [
-            "🔄 Resume subscription — Keep features uninterrupted.",
-            "⬇️ Downgrade to Free — Save costs until next salary credit.",
-            "🔁 Renew subscription — Pre-pay for next cycle."
-        ]
+    return alert
 
-    elif "transaction failed" in msg:
-        alert["recommendations"] = [
-            "⛽ Retry with higher gas — +20% gas ensures confirmation.",
-            "✂️ Retry smaller amount — Reduce transfer size.",
-            "🔀 Use backup wallet — Ensure transfer completes."
-        ]
 
-    elif "circle" in msg and "low" in msg:
-        alert["recommendations"] = [
-            "💳 Top-up with 100 USDC — Maintain $100 minimum balance.",
-            "🔁 Redeem USDC back — Rebalance treasury."
-        ]
+def _alert_key(alert: Dict) -> Hashable:
+    """Tx alerts are identified by (tx_hash, status); everything else by its alert_service id."""
+    if "tx_hash" in alert:
+        return ("tx", alert["tx_hash"], alert.get("status"))
+    return alert.get("id")
 
-    # Attach summary
-    if "recommendations" in alert:
-        alert["summary"] = f"⚠️ {alert['message']} Suggested actions: " + \
-            ", ".join([r.split('—')[0].strip() for r in alert["recommendations"]])
 
-    return alert
+def _remember(alert: Dict) -> bool:
+    """Append unless already buffered; keeps _recent_keys in step with deque evictions. Caller holds _lock."""
+    key = _alert_key(alert)
+    if key in _recent_keys:
+        return False
+    if len(_recent_alerts) == _recent_alerts.maxlen:
+        _recent_keys.discard(_alert_key(_recent_alerts[0]))  # about to be evicted
+    _recent_alerts.append(alert)
+    _recent_keys.add(key)
+    return True
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, WATCHER_WORKERS), thread_name_prefix="alert-watcher")
+        return _executor
+
+
+async def _run_blocking(fn: Callable, *args):
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), fn, *args)
+
+
+async def _lag_monitor(interval: float = LOOP_LAG_INTERVAL):
+    """Measure event-loop lag: how late a sleep(interval) wakes up."""
+    loop = asyncio.get_running_loop()
+    while True:
+        t = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, (loop.time() - t - interval) * 1000)
+        n = _stats["lag_samples"] + 1
+        _stats.update(
+            lag_samples=n, lag_last_ms=round(lag, 3), lag_max_ms=round(max(_stats["lag_max_ms"], lag), 3),
+            lag_avg_ms=round(_stats["lag_avg_ms"] + (lag - _stats["lag_avg_ms"]) / n, 3),
+        )
 
 
 async def _watch_loop(interval: int = 15):
@@ -68,43 +100,51 @@ async def _watch_loop(interval: int = 15):
     while True:
         try:
             # 1. Normal alerts (crypto, subscriptions, circle)
-            new_count = alert_service.check_alerts()
+            t = time.perf_counter()
+            new_count = await _run_blocking(alert_service.check_alerts)
+            ms = (time.perf_counter() - t) * 1000
+            _stats.update(last_check_ms=round(ms, 1), max_check_ms=round(max(_stats["max_check_ms"], ms), 1))
             if new_count > 0:
                 alerts = alert_service.get_alerts(limit=new_count)
+                enriched = [_advisor_style_enrichment(dict(a)) for a in alerts]
                 with _lock:
-                    for a in alerts:
-                        enriched = _advisor_style_enrichment(dict(a))
-                        if enriched not in _recent_alerts:
-                            _recent_alerts.append(enriched)
+                    for a in enriched:
+                        _remember(a)
                 print(f"[ALERT WATCHER] 🚨 {new_count} new alerts at {datetime.now()}")
 
-            # 2. Check pending transactions
-            if _pending_txs:
-                for tx in list(_pending_txs):
-                    res = crypto_service.check_tx(tx)
-                    if res.get("status") in ("confirmed", "failed"):
-                        with _lock:
-                            alert = {
-                                "id": int(datetime.utcnow().timestamp() * 1000),
-                                "level": "info" if res["status"] == "confirmed" else "error",
-                                "type": "crypto",
-                                "message": f"Tx {tx} {res['status']} in block {res.get('block')}",
-                                "explorer": res.get("explorer"),
-                                "timestamp": datetime.utcnow().isoformat(),
-                            }
-                            _recent_alerts.append(_advisor_style_enrichment(alert))
-                        _pending_txs.remove(tx)
-                        print(f"[ALERT WATCHER] ✅ Tx {tx} {res['status']}")
+            # 2. Check pending transactions (one eth_blockNumber; receipts batched, only on new blocks)
+            if len(tx_tracker):
+                for res in await _run_blocking(tx_tracker.poll):
+                    tx, status = res["tx_hash"], res["status"]
+                    if status == "expired":
+                        message = f"Tx {tx} dropped from tracking after {tx_tracker.ttl:g}s without a receipt"
+                    else:
+                        message = f"Tx {tx} {status} in block {res.get('blockNumber')}"
+                    alert = {
+                        "id": alert_service.reserve_id(),  # unique even for a batch confirmed in one poll
+                        "level": {"confirmed": "info", "expired": "warning"}.get(status, "error"),
+                        "type": "crypto",
+                        "message": message,
+                        "tx_hash": tx,
+                        "status": status,
+                        "explorer": f"{EXPLORER}/tx/{tx}",
+                        "timestamp": datetime.utcnow().isoformat(),
+                    }
+                    with _lock:
+                        _remember(_advisor_style_enrichment(alert))
+                    print(f"[ALERT WATCHER] ✅ Tx {tx} {status}")
 
         except Exception as e:
+            _stats["errors"] += 1
             print(f"[ALERT WATCHER] ❌ Error: {e}")
+        _stats["ticks"] += 1
         await asyncio.sleep(interval)
 
 
 def get_recent_alerts(limit: int = 20) -> List[Dict]:
     """Get most recent enriched alerts, fallback to demo if none."""
     with _lock:
-        alerts = list(_recent_alerts)[-limit:]
+        alerts = list(islice(reversed(_recent_alerts), max(limit, 0)))[::-1]
     if not alerts:
         # fallback demo alerts
         alerts = [
@@ -120,15 +160,30 @@ def get_recent_alerts(limit: int = 20) -> List[Dict]:
     return alerts
 
 
+def get_watcher_stats() -> Dict[str, Any]:
+    """Tick counts, check durations and event-loop lag."""
+    with _lock:
+        recent = len(_recent_alerts)
+    return {**_stats, "running": any(not t.done() for t in _tasks), "workers": WATCHER_WORKERS,
+            "recent_alerts": recent, "pending_txs": len(tx_tracker), "tx_tracker": tx_tracker.stats()}
+
+
 def start_watcher(loop_interval: int = 15):
-    """Kick off the background watcher in a thread-safe way."""
+    """Kick off the background watcher and loop-lag monitor (no-op if already running)."""
+    if any(not t.done() for t in _tasks):
+        return
     loop = asyncio.get_event_loop()
-    loop.create_task(_watch_loop(interval=loop_interval))
+    _tasks[:] = [loop.create_task(_watch_loop(interval=loop_interval)), loop.create_task(_lag_monitor())]
     print(f"[ALERT WATCHER] ✅ Started background alert watcher (every {loop_interval}s)")
 
 
+def stop_watcher():
+    for t in _tasks:
+        t.cancel()
+    _tasks.clear()
+
+
 def track_tx(tx_hash: str):
     """Register a tx hash for background confirmation checking."""
-    with _lock:
-        _pending_txs.add(tx_hash)
+    tx_tracker.track(tx_hash)
     print(f"[ALERT WATCHER] ⏳ Tracking tx {tx_hash}")
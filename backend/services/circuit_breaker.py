@@ -0,0 +1,80 @@
+# backend/services/circuit_breaker.py
+"""
+Circuit breaker for an upstream dependency (the chain RPC).
+
+CLOSED: calls go through; `failure_threshold` consecutive failures open it.
+OPEN: callers use their fallback; after `reset_timeout` seconds it turns
+HALF_OPEN. HALF_OPEN: calls (or a health probe) go through again; the first
+success closes the breaker, the first failure re-opens it.
+"""
+from __future__ import annotations
+import threading
+import time
+from enum import Enum
+from typing import Any, Dict, Optional
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._last_error: Optional[str] = None
+        self._stats = {"successes": 0, "failures": 0, "opened": 0, "rejected": 0}
+
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            return self._current()
+
+    def _current(self) -> BreakerState:
+        if self._state is BreakerState.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = BreakerState.HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """True when a live call may be attempted (CLOSED or HALF_OPEN)."""
+        with self._lock:
+            ok = self._current() is not BreakerState.OPEN
+            if not ok:
+                self._stats["rejected"] += 1
+            return ok
+
+    def record_success(self):
+        with self._lock:
+            self._stats["successes"] += 1
+            self._failures = 0
+            self._state = BreakerState.CLOSED
+
+    def record_failure(self, error: Any = None):
+        with self._lock:
+            self._stats["failures"] += 1
+            self._failures += 1
+            if error is not None:
+                self._last_error = str(error)
+            if self._current() is BreakerState.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state is not BreakerState.OPEN:
+                    self._stats["opened"] += 1
+                self._state, self._opened_at = BreakerState.OPEN, time.monotonic()
+
+    def reset(self):
+        with self._lock:
+            self._state, self._failures, self._last_error = BreakerState.CLOSED, 0, None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current()
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)) if state is BreakerState.OPEN else 0.0
+            return {**self._stats, "name": self.name, "state": state.value, "consecutive_failures": self._failures,
+                    "failure_threshold": self.failure_threshold, "reset_timeout_s": self.reset_timeout,
+                    "retry_in_s": round(retry_in, 1), "last_error": self._last_error}
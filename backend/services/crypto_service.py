@@ -1,10 +1,18 @@
-import os, uuid, time
-from typing import Dict, Any, Optional
+import asyncio, json, os, re, threading, uuid, time
+from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
-from web3 import Web3
+import aiohttp
+import httpx
+import requests
+from web3 import AsyncHTTPProvider, AsyncWeb3, Web3
+from web3.exceptions import TransactionNotFound, Web3RPCError
 import logging
 
-from backend.services import alert_service, log_service
+from backend.services import alert_service, http_client, log_service
+from backend.services.circuit_breaker import BreakerState, CircuitBreaker
+from backend.services.price_cache import prices as price_cache
+from backend.services.single_flight import flights
+from backend.services.token_registry import TokenMeta, tokens
 
 # --- Env ---
 load_dotenv()
@@ -13,10 +21,23 @@ DEMO_WALLET  = os.getenv("DEMO_WALLET_ADDRESS", "0xDEMO1234567890")
 DEMO_PK      = os.getenv("DEMO_WALLET_PRIVATE_KEY", "0xPRIVATEKEY")
 JUDGE_WALLET = os.getenv("JUDGE_WALLET_ADDRESS", "0xJUDGE1234567890")
 USDC_ADDR    = os.getenv("USDC_CONTRACT", "0x1c7D4B196Cb0C7B01d743Fbc6116a902379C7238")
+RPC_BATCH_SIZE = int(os.getenv("RPC_BATCH_SIZE", "200"))      # wallets per JSON-RPC batch (2 calls each)
+RPC_TIMEOUT    = float(os.getenv("RPC_TIMEOUT", "10"))
 
 # --- Web3 ---
-w3 = Web3(Web3.HTTPProvider(RPC_URL)) if RPC_URL else None
-CHAIN_OK = bool(w3 and w3.is_connected() and USDC_ADDR)
+# Nothing touches the network at import. Clients are built on first use, and a circuit
+# breaker fed by live calls and a background probe decides between live RPC and mock.
+CHAIN_FAILURE_THRESHOLD = int(os.getenv("CHAIN_FAILURE_THRESHOLD", "3"))
+CHAIN_RESET_TIMEOUT     = float(os.getenv("CHAIN_RESET_TIMEOUT", "30"))
+CHAIN_PROBE_INTERVAL    = float(os.getenv("CHAIN_PROBE_INTERVAL", "30"))
+chain = CircuitBreaker("rpc", CHAIN_FAILURE_THRESHOLD, CHAIN_RESET_TIMEOUT)
+_w3: Optional[Web3] = None
+_probe_task: Optional[asyncio.Task] = None
+# Async twin for async routes, on a pooled aiohttp session we own (one per event loop)
+_aw3: Optional[AsyncWeb3] = None
+_aw3_session: Optional[aiohttp.ClientSession] = None
+_aw3_lock: Optional[asyncio.Lock] = None
+_aw3_loop: Optional[asyncio.AbstractEventLoop] = None  # loop owning _aw3_session and _aw3_lock
 
 EXPLORER = "https://sepolia.etherscan.io"
 
@@ -24,13 +45,25 @@ EXPLORER = "https://sepolia.etherscan.io"
 logger = logging.getLogger(__name__)
 
 # --- CoinGecko ---
+COINGECKO_PRICE_URL = "https://api.coingecko.com/api/v3/simple/price"
+
 try:
     from pycoingecko import CoinGeckoAPI
     _cg = CoinGeckoAPI()
 except Exception:
     _cg = None
 
-_CG_IDS = {"BTC": "bitcoin", "ETH": "ethereum", "SOL": "solana", "DOGE": "dogecoin", "USDC": "usd-coin"}
+# Pinned ids for symbols that are ambiguous on CoinGecko; everything else comes from the coin list
+_CG_IDS = {
+    "BTC": "bitcoin", "ETH": "ethereum", "SOL": "solana", "DOGE": "dogecoin", "USDC": "usd-coin",
+    "USDT": "tether", "DAI": "dai", "BNB": "binancecoin", "XRP": "ripple", "ADA": "cardano",
+    "AVAX": "avalanche-2", "DOT": "polkadot", "MATIC": "matic-network", "POL": "polygon-ecosystem-token",
+    "LINK": "chainlink", "LTC": "litecoin", "ARB": "arbitrum", "OP": "optimism", "WETH": "weth",
+}
+_coin_ids: Optional[Dict[str, str]] = None
+_coin_ids_lock = threading.Lock()
+_coin_ids_retry_at = 0.0
+COIN_LIST_RETRY = float(os.getenv("COIN_LIST_RETRY", "60"))   # seconds before retrying a failed coin list fetch
 _MOCK = {"BTC": 67000, "ETH": 3500, "SOL": 150, "DOGE": 0.2, "USDC": 1.0}
 
 # --- ERC-20 ABI ---
@@ -39,75 +72,450 @@ ERC20_ABI = [
      "name": "transfer","outputs": [{"name": "", "type": "bool"}],"type": "function"},
     {"constant": True,"inputs": [{"name": "_owner", "type": "address"}],
      "name": "balanceOf","outputs": [{"name": "balance", "type": "uint256"}],"type": "function"},
+    {"constant": True,"inputs": [],"name": "decimals","outputs": [{"name": "", "type": "uint8"}],"type": "function"},
+    {"constant": True,"inputs": [],"name": "symbol","outputs": [{"name": "", "type": "string"}],"type": "function"},
 ]
+_SEL_BALANCE_OF, _SEL_DECIMALS, _SEL_SYMBOL = "0x70a08231", "0x313ce567", "0x95d89b41"
 
 # --- Helpers ---
 def _pseudo_tx() -> str: 
     return "0x" + uuid.uuid4().hex * 2
 
-def is_chain_enabled() -> bool: 
-    return CHAIN_OK
+def chain_configured() -> bool:
+    return bool(RPC_URL and USDC_ADDR)
+
+
+def is_chain_enabled() -> bool:
+    """Live RPC is configured and the breaker is not open."""
+    return chain_configured() and chain.allow()
+
+
+def _get_w3() -> Web3:
+    global _w3
+    if _w3 is None or _w3.provider.endpoint_uri != RPC_URL:
+        _w3 = Web3(Web3.HTTPProvider(RPC_URL, request_kwargs={"timeout": RPC_TIMEOUT}))
+    return _w3
+
+
+class RpcError(RuntimeError):
+    """The node answered with a JSON-RPC error instead of a result."""
+
+
+def _is_chain_failure(e: BaseException) -> bool:
+    """Transport, 5xx and JSON-RPC errors count against the breaker; local validation errors do not."""
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code >= 500
+    if isinstance(e, requests.HTTPError):
+        return e.response is None or e.response.status_code >= 500
+    if isinstance(e, aiohttp.ClientResponseError):
+        return e.status >= 500
+    return isinstance(e, (httpx.TransportError, requests.ConnectionError, requests.Timeout,
+                          aiohttp.ClientConnectionError, asyncio.TimeoutError, ConnectionError,
+                          json.JSONDecodeError, Web3RPCError, RpcError))
+
+
+def _record(e: BaseException):
+    if isinstance(e, TransactionNotFound):
+        chain.record_success()  # the node answered
+    elif _is_chain_failure(e):
+        chain.record_failure(e)
+
+
+def _on_chain(fn):
+    """Run a live chain call and report the outcome to the breaker."""
+    try:
+        res = fn()
+    except Exception as e:
+        _record(e)
+        raise
+    chain.record_success()
+    return res
+
+
+async def _aon_chain(fn):
+    try:
+        res = await fn()
+    except Exception as e:
+        _record(e)
+        raise
+    chain.record_success()
+    return res
+
+
+def probe_chain() -> bool:
+    """One eth_blockNumber round trip; the result feeds the breaker."""
+    if not chain_configured():
+        return False
+    try:
+        rpc_batch([{"jsonrpc": "2.0", "id": 0, "method": "eth_blockNumber", "params": []}])
+        return True
+    except Exception:
+        return False
+
+
+async def _probe_loop(interval: float):
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        if chain_configured() and chain.state is not BreakerState.OPEN:
+            await loop.run_in_executor(None, probe_chain)
+
+
+def start_chain_probe(interval: float = CHAIN_PROBE_INTERVAL):
+    """Start the background health probe on the running loop (app startup)."""
+    global _probe_task
+    if _probe_task is None or _probe_task.done():
+        _probe_task = asyncio.get_running_loop().create_task(_probe_loop(interval))
+
+
+def stop_chain_probe():
+    global _probe_task
+    if _probe_task is not None:
+        _probe_task.cancel()
+        _probe_task = None
+
+
+async def _get_aw3() -> AsyncWeb3:
+    global _aw3, _aw3_session, _aw3_lock, _aw3_loop
+    loop = asyncio.get_running_loop()
+    if _aw3_loop is not loop:
+        # The session and lock belong to the loop that created them; start over on a new one
+        _aw3, _aw3_session, _aw3_lock, _aw3_loop = None, None, asyncio.Lock(), loop
+    if _aw3 is not None and not _aw3_session.closed:
+        return _aw3
+    async with _aw3_lock:
+        if _aw3 is None or _aw3_session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=http_client.HTTP_MAX_CONNECTIONS,
+                                               keepalive_timeout=http_client.HTTP_KEEPALIVE_EXPIRY),
+                timeout=aiohttp.ClientTimeout(total=RPC_TIMEOUT),
+            )
+            provider = AsyncHTTPProvider(RPC_URL)
+            # web3 7.x (pinned to 7.2.0 in requirements.txt) shares one class-level asyncio.Lock,
+            # AsyncBaseProvider._request_cache_lock, across providers; it binds to the first loop that
+            # waits on it, so each provider gets its own
+            provider._request_cache_lock = asyncio.Lock()
+            await provider.cache_async_session(session)
+            _aw3, _aw3_session = AsyncWeb3(provider), session
+    return _aw3
+
+
+async def aclose():
+    """Close the async provider's pooled session (app shutdown)."""
+    global _aw3, _aw3_session
+    session, _aw3, _aw3_session = _aw3_session, None, None
+    if session is not None and not session.closed:
+        await session.close()
 
 
 # --- Prices ---
-def get_price(symbol: str = "USDC") -> Optional[Dict[str, Any]]:
-    """Fetch price from CoinGecko with fallback to mock."""
+def _load_coin_ids() -> Dict[str, str]:
+    """
+    SYMBOL -> CoinGecko id from /coins/list, loaded once; _CG_IDS wins over the
+    list. A failed fetch is not cached: _CG_IDS is served and the list is retried
+    on a call after COIN_LIST_RETRY seconds.
+    """
+    global _coin_ids, _coin_ids_retry_at
+    with _coin_ids_lock:
+        if _coin_ids is not None:
+            return _coin_ids
+        if time.monotonic() < _coin_ids_retry_at:
+            return _CG_IDS
+        ids: Dict[str, str] = {}
+        try:
+            by_sym: Dict[str, list] = {}
+            for c in (_cg.get_coins_list() if _cg else []):
+                by_sym.setdefault(str(c.get("symbol", "")).upper(), []).append(c)
+            for sym, coins in by_sym.items():
+                # Ambiguous symbol: prefer the coin whose id is its own name, then the shortest id
+                best = min(coins, key=lambda c: (c["id"] != str(c.get("name", "")).lower(), len(c["id"])))
+                ids[sym] = best["id"]
+        except Exception as e:
+            logger.warning(f"[crypto_service] CoinGecko coin list unavailable, retrying in {COIN_LIST_RETRY:g}s: {e}")
+            _coin_ids_retry_at = time.monotonic() + COIN_LIST_RETRY
+            return _CG_IDS
+        ids.update(_CG_IDS)
+        _coin_ids = ids
+        return _coin_ids
+
+
+def coin_id(symbol: str) -> Optional[str]:
     sym = (symbol or "").upper()
+    return _CG_IDS.get(sym) or _load_coin_ids().get(sym)
+
+
+def _fetch_cg_prices(ids: List[str]) -> Dict[str, float]:
+    """One CoinGecko simple/price request for all ids; concurrent identical requests share it."""
+    def fetch():
+        r = http_client.get_client().get(COINGECKO_PRICE_URL, params={"ids": ",".join(ids), "vs_currencies": "usd"})
+        r.raise_for_status()
+        return {i: float(v["usd"]) for i, v in r.json().items() if v.get("usd")}
+    return flights.do(("coingecko", tuple(sorted(ids))), fetch)
+
 
-    if _cg and sym in _CG_IDS:
+def get_prices(symbols: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Prices for many symbols. Cached symbols come from the shared price cache
+    and every missing one is fetched in a single CoinGecko request. Falls back
+    per symbol to a stale cached value, then to the mock table; unknown
+    symbols map to None.
+    """
+    syms = list(dict.fromkeys((s or "").upper() for s in symbols if s))
+    ids = {s: coin_id(s) for s in syms}
+    wanted = [i for i in dict.fromkeys(ids.values()) if i]
+    got: Dict[str, float] = {}
+    if wanted:
         try:
-            data = _cg.get_price(ids=[_CG_IDS[sym]], vs_currencies=["usd"])
-            price = data.get(_CG_IDS[sym], {}).get("usd")
-            if price:
-                return {"symbol": sym, "price": float(price), "currency": "USD"}
+            got = price_cache.get_many(wanted, _fetch_cg_prices)
         except Exception as e:
-            logger.warning(f"[crypto_service] CoinGecko error for {sym}: {e}")
+            logger.warning(f"[crypto_service] CoinGecko error for {','.join(syms)}: {e}")
 
-    # fallback mock
-    if sym in _MOCK:
-        return {"symbol": sym, "price": float(_MOCK[sym]), "currency": "USD", "note": "mock fallback"}
-    return None
+    out: Dict[str, Optional[Dict[str, Any]]] = {}
+    for sym in syms:
+        cid = ids.get(sym)
+        if cid in got:
+            out[sym] = {"symbol": sym, "price": got[cid], "currency": "USD"}
+            continue
+        cached = price_cache.peek(cid) if cid else None
+        if cached:
+            out[sym] = {"symbol": sym, "price": cached[0], "currency": "USD",
+                        "note": f"stale cached value ({cached[1]:.0f}s old)"}
+        elif sym in _MOCK:
+            out[sym] = {"symbol": sym, "price": float(_MOCK[sym]), "currency": "USD", "note": "mock fallback"}
+        else:
+            out[sym] = None
+    return out
+
+
+def get_price(symbol: str = "USDC") -> Optional[Dict[str, Any]]:
+    """Fetch price from CoinGecko (through the shared price cache) with fallback to mock."""
+    sym = (symbol or "").upper()
+    return get_prices([sym]).get(sym) if sym else None
 
 
 # --- Balances ---
+def _balance(address: str, eth: float, usdc: float) -> Dict[str, Any]:
+    return {
+        "address": address,
+        "usdc": round(usdc, 6),
+        "eth": round(eth, 6),
+        "explorer": f"{EXPLORER}/address/{address}",
+    }
+
+
+_CIRCUIT_OPEN = "[MOCK] chain circuit open"
+_ADDR_RE = re.compile(r"^0x[0-9a-fA-F]{40}$")
+_TX_RE = re.compile(r"^0x[0-9a-fA-F]{64}$")
+
+
+def _mock_balance(address: str, usdc: float = 42.0, eth: float = 0.123,
+                  note: str = "[MOCK] no chain connection") -> Dict[str, Any]:
+    return {"address": address, "usdc": usdc, "eth": eth, "explorer": f"{EXPLORER}/address/{address}", "note": note}
+
+
 def get_balance(address: str = DEMO_WALLET) -> Dict[str, Any]:
     """Fetch ETH + USDC balance. Always falls back to mock on error."""
     if not address:
         return {"error": "address_required"}
 
     # No chain? Always return demo
-    if not CHAIN_OK:
-        return {
-            "address": address,
-            "usdc": 42.0,
-            "eth": 0.123,
-            "explorer": f"{EXPLORER}/address/{address}",
-            "note": "[MOCK] no chain connection"
-        }
+    if not chain_configured():
+        return _mock_balance(address)
+    if not _ADDR_RE.match(address):
+        return _mock_balance(address, 50.0, 0.25, "[MOCK] fallback due to error: invalid address")
+    if not chain.allow():
+        return _mock_balance(address, 50.0, 0.25, _CIRCUIT_OPEN)
 
-    try:
-        cs = Web3.to_checksum_address(address)
+    def fetch():
+        cs = tokens.checksum(address)
+        w3 = _get_w3()
         eth = float(w3.eth.get_balance(cs)) / 1e18
 
-        contract = w3.eth.contract(address=Web3.to_checksum_address(USDC_ADDR), abi=ERC20_ABI)
-        usdc_raw = contract.functions.balanceOf(cs).call()
-        usdc = usdc_raw / (10 ** 6)
+        contract = tokens.contract(w3, USDC_ADDR, ERC20_ABI)
+        usdc = usdc_meta.to_units(contract.functions.balanceOf(cs).call())
 
-        return {
-            "address": address,
-            "usdc": round(usdc, 6),
-            "eth": round(eth, 6),
-            "explorer": f"{EXPLORER}/address/{address}",
-        }
+        return _balance(address, eth, usdc)
+
+    try:
+        usdc_meta = token_meta(USDC_ADDR)
+        # Concurrent lookups of the same wallet share one pair of RPCs
+        return dict(flights.do(("rpc", f"balance:{address.lower()}"), lambda: _on_chain(fetch)))
     except Exception as e:
         logger.warning(f"[crypto_service] Balance fetch error for {address}: {e}")
-        return {
-            "address": address,
-            "usdc": 50.0,
-            "eth": 0.25,
-            "explorer": f"{EXPLORER}/address/{address}",
-            "note": f"[MOCK] fallback due to error: {e}"
-        }
+        return _mock_balance(address, 50.0, 0.25, f"[MOCK] fallback due to error: {e}")
+
+
+async def aget_balance(address: str = DEMO_WALLET) -> Dict[str, Any]:
+    """Async get_balance over AsyncWeb3; same result shape and fallbacks."""
+    if not address:
+        return {"error": "address_required"}
+    if not chain_configured():
+        return _mock_balance(address)
+    if not _ADDR_RE.match(address):
+        return _mock_balance(address, 50.0, 0.25, "[MOCK] fallback due to error: invalid address")
+    if not chain.allow():
+        return _mock_balance(address, 50.0, 0.25, _CIRCUIT_OPEN)
+
+    async def fetch():
+        aw3 = await _get_aw3()
+        cs = tokens.checksum(address)
+        contract = tokens.contract(aw3, USDC_ADDR, ERC20_ABI)
+        eth_raw, usdc_raw = await asyncio.gather(aw3.eth.get_balance(cs), contract.functions.balanceOf(cs).call())
+        return _balance(address, float(eth_raw) / 1e18, usdc_meta.to_units(usdc_raw))
+
+    try:
+        usdc_meta = tokens.peek(USDC_ADDR) or await asyncio.get_running_loop().run_in_executor(
+            None, token_meta, USDC_ADDR)
+        return dict(await flights.ado(("rpc", f"balance:{address.lower()}"), lambda: _aon_chain(fetch)))
+    except Exception as e:
+        logger.warning(f"[crypto_service] Balance fetch error for {address}: {e}")
+        return _mock_balance(address, 50.0, 0.25, f"[MOCK] fallback due to error: {e}")
+
+
+def rpc_batch(calls: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+    """POST one JSON-RPC batch; responses keyed by request id."""
+    def post():
+        resp = http_client.get_client().post(RPC_URL, json=calls, timeout=RPC_TIMEOUT)
+        resp.raise_for_status()
+        body = resp.json()
+        if isinstance(body, dict):  # some nodes answer a failed batch with a single error object
+            raise RpcError(body.get("error") or body)
+        return {int(r["id"]): r for r in body if isinstance(r, dict) and "id" in r}
+    return _on_chain(post)
+
+
+def hex_result(r: Optional[Dict[str, Any]]) -> int:
+    if not r or "error" in r:
+        raise RuntimeError((r or {}).get("error") or "missing response")
+    res = r.get("result") or "0x0"
+    return int(res, 16) if res != "0x" else 0
+
+
+def _erc20_call(call_id: int, token: str, selector: str, owner: Optional[str] = None) -> Dict[str, Any]:
+    data = selector + (owner.lower()[2:].rjust(64, "0") if owner else "")
+    return {"jsonrpc": "2.0", "id": call_id, "method": "eth_call", "params": [{"to": token.lower(), "data": data}, "latest"]}
+
+
+def _decode_symbol(r: Optional[Dict[str, Any]]) -> str:
+    raw = bytes.fromhex(((r or {}).get("result") or "0x")[2:])
+    if len(raw) >= 64:  # ABI string: offset, length, bytes
+        offset = int.from_bytes(raw[:32], "big")
+        length = int.from_bytes(raw[offset:offset + 32], "big")
+        raw = raw[offset + 32:offset + 32 + length]
+    return raw.rstrip(b"\0").decode("utf-8", "replace")  # also covers bytes32 symbols (e.g. MKR)
+
+
+def _fetch_token_meta(token: str) -> TokenMeta:
+    """decimals() and symbol() in one JSON-RPC batch."""
+    res = rpc_batch([_erc20_call(0, token, _SEL_DECIMALS), _erc20_call(1, token, _SEL_SYMBOL)])
+    if ((res.get(0) or {}).get("result") or "0x") == "0x":
+        raise RuntimeError(f"{token} has no decimals(); not an ERC-20 contract?")
+    try:
+        symbol = _decode_symbol(res.get(1)) if "error" not in (res.get(1) or {}) else ""
+    except ValueError:
+        symbol = ""  # symbol() is optional in ERC-20
+    return TokenMeta(token, symbol, hex_result(res.get(0)))
+
+
+def token_meta(token: str) -> TokenMeta:
+    """Symbol and decimals for an ERC-20, fetched once per token and kept in the token registry."""
+    return tokens.meta(token, lambda cs: flights.do(("rpc", f"token:{cs.lower()}"), lambda: _fetch_token_meta(cs)))
+
+
+def get_balances(addresses: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    ETH + USDC balances for many wallets. Every wallet costs one eth_getBalance
+    and one eth_call balanceOf, sent as JSON-RPC batches of RPC_BATCH_SIZE
+    wallets, so 1,000 wallets take 5 HTTP round trips. Keyed by the address as
+    given; wallets that fail carry an "error" instead of balances.
+    """
+    out: Dict[str, Dict[str, Any]] = {}
+    if not chain_configured():
+        return {a: _mock_balance(a) for a in addresses}
+    if not chain.allow():
+        return {a: {"address": a, "error": "chain circuit open"} for a in addresses}
+
+    valid = []
+    for a in dict.fromkeys(addresses):
+        if _ADDR_RE.match(a or ""):
+            valid.append(a)
+        else:
+            out[a] = {"address": a, "error": "invalid address"}
+    if not valid:
+        return out
+    try:
+        usdc = token_meta(USDC_ADDR)
+    except Exception as e:
+        logger.warning(f"[crypto_service] USDC metadata fetch error: {e}")
+        return {**out, **{a: {"address": a, "error": str(e)} for a in valid}}
+    for start in range(0, len(valid), max(1, RPC_BATCH_SIZE)):
+        chunk = valid[start:start + max(1, RPC_BATCH_SIZE)]
+        calls: List[Dict[str, Any]] = []
+        for i, a in enumerate(chunk):
+            calls.append({"jsonrpc": "2.0", "id": 2 * i, "method": "eth_getBalance", "params": [a, "latest"]})
+            calls.append(_erc20_call(2 * i + 1, USDC_ADDR, _SEL_BALANCE_OF, a))
+        try:
+            res = rpc_batch(calls)
+        except Exception as e:
+            logger.warning(f"[crypto_service] Batch balance fetch error ({len(chunk)} wallets): {e}")
+            for a in chunk:
+                out[a] = {"address": a, "error": str(e)}
+            continue
+        for i, a in enumerate(chunk):
+            try:
+                out[a] = _balance(a, hex_result(res.get(2 * i)) / 1e18, usdc.to_units(hex_result(res.get(2 * i + 1))))
+            except Exception as e:
+                out[a] = {"address": a, "error": str(e)}
+    return out
+
+
+def get_token_balances(addresses: List[str], token: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Balances of any ERC-20 for many wallets. Symbol and decimals come from the
+    token registry, so each wallet costs one balanceOf eth_call, sent in
+    JSON-RPC batches of RPC_BATCH_SIZE. Keyed by the address as given.
+    """
+    out: Dict[str, Dict[str, Any]] = {}
+    valid = []
+    for a in dict.fromkeys(addresses):
+        if _ADDR_RE.match(a or ""):
+            valid.append(a)
+        else:
+            out[a] = {"address": a, "error": "invalid address"}
+    if not valid:
+        return out
+    error = None
+    if not _ADDR_RE.match(token or ""):
+        error = "invalid token address"
+    elif not chain_configured():
+        error = "no chain connection"
+    elif not chain.allow():
+        error = "chain circuit open"
+    if error is None:
+        try:
+            meta = token_meta(token)
+        except Exception as e:
+            logger.warning(f"[crypto_service] Token metadata fetch error for {token}: {e}")
+            error = str(e)
+    if error is not None:
+        return {**out, **{a: {"address": a, "token": token, "error": error} for a in valid}}
+
+    for start in range(0, len(valid), max(1, RPC_BATCH_SIZE)):
+        chunk = valid[start:start + max(1, RPC_BATCH_SIZE)]
+        try:
+            res = rpc_batch([_erc20_call(i, meta.address, _SEL_BALANCE_OF, a) for i, a in enumerate(chunk)])
+        except Exception as e:
+            logger.warning(f"[crypto_service] Batch token balance fetch error ({len(chunk)} wallets): {e}")
+            for a in chunk:
+                out[a] = {"address": a, "token": meta.address, "error": str(e)}
+            continue
+        for i, a in enumerate(chunk):
+            try:
+                out[a] = {"address": a, "token": meta.address, "symbol": meta.symbol,
+                          "balance": round(meta.to_units(hex_result(res.get(i))), meta.decimals)}
+            except Exception as e:
+                out[a] = {"address": a, "token": meta.address, "error": str(e)}
+    return out
 
 
 # --- Transactions ---
@@ -116,12 +524,16 @@ def check_tx(tx_hash: str) -> Dict[str, Any]:
     if not tx_hash:
         return {"error": "tx_hash required"}
 
-    if not CHAIN_OK:
+    if not chain_configured():
         # Mock fallback
         return {"tx_hash": tx_hash, "status": "confirmed", "mode": "mock"}
+    if not _TX_RE.match(tx_hash):
+        return {"tx_hash": tx_hash, "status": "error", "error": "invalid tx hash", "mode": "api"}
+    if not chain.allow():
+        return {"tx_hash": tx_hash, "status": "error", "error": "chain circuit open", "mode": "api"}
 
     try:
-        receipt = w3.eth.get_transaction_receipt(tx_hash)
+        receipt = _on_chain(lambda: _get_w3().eth.get_transaction_receipt(tx_hash))
         if receipt is None:
             return {"tx_hash": tx_hash, "status": "pending", "mode": "api"}
         status = "confirmed" if receipt.status == 1 else "failed"
@@ -131,6 +543,8 @@ def check_tx(tx_hash: str) -> Dict[str, Any]:
             "blockNumber": receipt.blockNumber,
             "mode": "api"
         }
+    except TransactionNotFound:
+        return {"tx_hash": tx_hash, "status": "pending", "mode": "api"}
     except Exception as e:
         logger.warning(f"[crypto_service] TX check error {tx_hash}: {e}")
         return {
@@ -139,3 +553,33 @@ def check_tx(tx_hash: str) -> Dict[str, Any]:
             "error": str(e),
             "mode": "api"
         }
+
+
+async def _aw3_receipt(tx_hash: str):
+    return await (await _get_aw3()).eth.get_transaction_receipt(tx_hash)
+
+
+async def acheck_tx(tx_hash: str) -> Dict[str, Any]:
+    """Async check_tx over AsyncWeb3; a tx without a receipt yet is reported as pending."""
+    if not tx_hash:
+        return {"error": "tx_hash required"}
+    if not chain_configured():
+        return {"tx_hash": tx_hash, "status": "confirmed", "mode": "mock"}
+    if not _TX_RE.match(tx_hash):
+        return {"tx_hash": tx_hash, "status": "error", "error": "invalid tx hash", "mode": "api"}
+    if not chain.allow():
+        return {"tx_hash": tx_hash, "status": "error", "error": "chain circuit open", "mode": "api"}
+
+    try:
+        receipt = await _aon_chain(lambda: _aw3_receipt(tx_hash))
+    except TransactionNotFound:
+        return {"tx_hash": tx_hash, "status": "pending", "mode": "api"}
+    except Exception as e:
+        logger.warning(f"[crypto_service] TX check error {tx_hash}: {e}")
+        return {"tx_hash": tx_hash, "status": "error", "error": str(e), "mode": "api"}
+    return {
+        "tx_hash": tx_hash,
+        "status": "confirmed" if receipt["status"] == 1 else "failed",
+        "blockNumber": receipt["blockNumber"],
+        "mode": "api"
+    }
@@ -0,0 +1,91 @@
+# backend/services/http_client.py
+"""
+Shared outbound HTTP clients.
+
+One keep-alive connection pool per process instead of a fresh client (TCP +
+TLS handshake) per request. The async client is created on app startup and
+closed on shutdown (see main.py); outside the app, e.g. in scripts and
+tests, it is created lazily on first use. HTTP/2 is negotiated when the
+`h2` package is installed (httpx[http2]) and HTTP_HTTP2 is not disabled.
+"""
+from __future__ import annotations
+import asyncio
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+
+try:
+    import h2  # noqa: F401
+    _H2 = os.getenv("HTTP_HTTP2", "true").lower() == "true"
+except ImportError:
+    _H2 = False
+
+_lock = threading.Lock()
+_async_client: Optional[httpx.AsyncClient] = None
+_async_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_client: Optional[httpx.Client] = None
+
+
+def _options() -> Dict[str, Any]:
+    return {
+        "http2": _H2,
+        "timeout": HTTP_TIMEOUT,
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """The pooled AsyncClient for the running event loop."""
+    global _async_client, _async_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client.is_closed or _async_loop is not loop:
+        _async_client, _async_loop = httpx.AsyncClient(**_options()), loop
+    return _async_client
+
+
+def get_client() -> httpx.Client:
+    """The pooled sync Client, for code running in worker threads."""
+    global _sync_client
+    with _lock:
+        if _sync_client is None or _sync_client.is_closed:
+            _sync_client = httpx.Client(**_options())
+        return _sync_client
+
+
+async def start():
+    get_async_client()
+    get_client()
+
+
+async def close():
+    global _async_client, _sync_client
+    client, _async_client = _async_client, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+    with _lock:
+        sync, _sync_client = _sync_client, None
+    if sync is not None:
+        sync.close()
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "http2": _H2,
+        "async_open": _async_client is not None and not _async_client.is_closed,
+        "sync_open": _sync_client is not None and not _sync_client.is_closed,
+        "max_connections": HTTP_MAX_CONNECTIONS,
+        "max_keepalive": HTTP_MAX_KEEPALIVE,
+        "keepalive_expiry_s": HTTP_KEEPALIVE_EXPIRY,
+        "timeout_s": HTTP_TIMEOUT,
+    }
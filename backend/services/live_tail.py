@@ -0,0 +1,116 @@
+# backend/services/live_tail.py
+"""
+Live tail fan-out for server-sent events.
+
+Producers (`add_log`, `add_alert`) call `Broadcaster.publish()` from any
+thread; each SSE client owns an `asyncio.Queue` on its event loop and is fed
+through `call_soon_threadsafe`. A client that falls too far behind is dropped
+and simply reconnects with `Last-Event-ID` to catch up from the backlog.
+
+Items without an "id" are updates to an earlier item (e.g. a coalesced log
+entry's repeat count). They go out as `<event>_patch` frames with no `id:`
+line, so they never move a client's Last-Event-ID. They are live-only: a
+client that was disconnected misses them, and an item re-read from the
+backlog already carries its latest state.
+"""
+from __future__ import annotations
+import asyncio, json, threading
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional
+
+Item = Dict[str, object]
+_OVERFLOW = object()
+
+
+class Subscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def _offer(self, item: object):
+        if self.overflowed: return
+        try: self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.queue.get_nowait(); self.queue.put_nowait(_OVERFLOW)
+
+
+class Broadcaster:
+    def __init__(self, max_queue: int = 1000):
+        self.max_queue = max_queue
+        self._subs: List[Subscription] = []
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subs)
+
+    def subscribe(self) -> Subscription:
+        """Register a subscriber on the running event loop."""
+        sub = Subscription(asyncio.get_running_loop(), self.max_queue)
+        with self._lock: self._subs = self._subs + [sub]
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock: self._subs = [s for s in self._subs if s is not sub]
+
+    def publish(self, item: Item):
+        """Thread-safe; O(1) when nobody is listening."""
+        for sub in self._subs:
+            try: sub.loop.call_soon_threadsafe(sub._offer, item)
+            except RuntimeError: self.unsubscribe(sub)   # loop closed
+
+
+def format_sse(item: Item, event: str) -> str:
+    if "id" not in item:
+        return f"event: {event}_patch\ndata: {json.dumps(item, default=str)}\n\n"
+    return f"id: {item.get('id')}\nevent: {event}\ndata: {json.dumps(item, default=str)}\n\n"
+
+
+def parse_last_event_id(raw: Optional[str]) -> Optional[int]:
+    try: return int(raw) if raw not in (None, "") else None
+    except (TypeError, ValueError): return None
+
+
+async def sse_stream(
+    request,
+    broadcaster: Broadcaster,
+    backlog: Callable[[int], Iterable[Item]],
+    matches: Callable[[Item], bool],
+    last_id: Optional[int] = None,
+    event: str = "message",
+    heartbeat: float = 15.0,
+) -> AsyncIterator[str]:
+    """
+    Yield SSE frames: first the backlog after `last_id` (paged through
+    `backlog(after_id)`), then live items. Subscribing before reading the
+    backlog means nothing published in between is lost; live items already
+    sent from the backlog are skipped.
+    """
+    sub = broadcaster.subscribe()
+    try:
+        yield "retry: 3000\n\n"
+        if last_id is not None:
+            while True:
+                page = list(backlog(last_id))
+                if not page: break
+                for item in page:
+                    if matches(item): yield format_sse(item, event)
+                    last_id = int(item["id"])
+        skip_upto = last_id
+        while True:
+            try: item = await asyncio.wait_for(sub.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected(): return
+                yield ": keepalive\n\n"
+                continue
+            if item is _OVERFLOW: return   # client resumes with Last-Event-ID
+            if "id" not in item:   # unsequenced patch of an earlier item
+                if matches(item): yield format_sse(item, event)
+                continue
+            if skip_upto is not None:
+                if int(item.get("id", 0)) <= skip_upto: continue
+                skip_upto = None
+            if matches(item): yield format_sse(item, event)
+    finally:
+        broadcaster.unsubscribe(sub)
@@ -0,0 +1,425 @@
+# backend/services/log_journal.py
+"""
+Append-only JSONL segment journal for the audit log.
+
+Entries are appended as one JSON line to the active segment file, so a write
+costs O(1) regardless of how many entries are retained. When the active
+segment fills up a new one is opened, and whole segments that fall outside
+the retention window are dropped (compaction). Replay reads the segments back
+in order and tolerates a torn last line from a crash mid-write.
+
+Besides entries, the journal may hold `{"op": "patch", "id": ...}` records
+that update an earlier entry in place (used for repeat counts); replay folds
+them into their target.
+
+With a `SegmentArchive` attached, every closed segment is also rotated into a
+gzip-compressed archive file. A sidecar `index.jsonl` records the id range,
+time range and per-type counts of each archived segment, so historical
+queries only open the segments that can contain matches.
+
+`JournalWriter` moves the file I/O off the caller's thread: operations are
+queued and a single writer thread group-commits them in batches.
+"""
+from __future__ import annotations
+import gzip, json, os, re, threading, time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, Dict, IO, Iterable, List, Optional, Tuple
+
+Record = Dict[str, object]
+
+_SEGMENT_RE = re.compile(r"^seg-(\d+)\.jsonl$")
+_TS_FMT = "%Y-%m-%d %H:%M:%S"
+
+
+def record_ts(r: Record, default: float = 0.0) -> float:
+    """Epoch seconds of a log record ("ts", or parsed from "timestamp")."""
+    ts = r.get("ts")
+    if isinstance(ts, (int, float)): return float(ts)
+    try: return datetime.strptime(str(r.get("timestamp")), _TS_FMT).timestamp()
+    except Exception: return default
+
+
+def is_patch(r: Record) -> bool:
+    return r.get("op") == "patch"
+
+
+def apply_patches(records: List[Record]) -> Tuple[List[Record], List[Record]]:
+    """Fold patch records into the entries they target; returns (entries, orphan patches)."""
+    entries: List[Record] = []
+    by_id: Dict[object, Record] = {}
+    orphans: List[Record] = []
+    for r in records:
+        if is_patch(r):
+            target = by_id.get(r.get("id"))
+            if target is not None: target.update({k: v for k, v in r.items() if k not in ("op", "id")})
+            else: orphans.append(r)
+        else:
+            entries.append(r); by_id[r.get("id")] = r
+    return entries, orphans
+
+
+def _read_jsonl(lines: Iterable[str]) -> List[Record]:
+    out: List[Record] = []
+    for line in lines:
+        line = line.strip()
+        if not line: continue
+        try: out.append(json.loads(line))
+        except ValueError: pass   # torn write
+    return out
+
+
+class SegmentArchive:
+    """Compressed, indexed store of closed journal segments (oldest first)."""
+
+    def __init__(self, directory: Path, max_segments: int = 0, cache_segments: int = 16):
+        self.directory = Path(directory)
+        self.max_segments = max(0, int(max_segments))   # 0 = keep forever
+        self.cache_segments = max(1, int(cache_segments))
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, List[Record]]" = OrderedDict()
+        self._overrides: Dict[int, Record] = {}   # patches that arrived after their entry was archived
+        self._load_index()
+
+    @property
+    def _index_file(self) -> Path:
+        return self.directory / "index.jsonl"
+
+    @property
+    def _overrides_file(self) -> Path:
+        return self.directory / "patches.jsonl"
+
+    def _load_index(self):
+        metas: List[Record] = []
+        try:
+            if self._index_file.exists():
+                metas = _read_jsonl(self._index_file.read_text(encoding="utf-8").splitlines())
+            if self._overrides_file.exists():
+                for r in _read_jsonl(self._overrides_file.read_text(encoding="utf-8").splitlines()):
+                    self._overrides.setdefault(int(r["id"]), {}).update(r)
+        except OSError: pass
+        self._set(sorted(metas, key=lambda m: m["min_id"]))
+
+    def _add_overrides(self, patches: List[Record]):
+        new = [r for r in patches if {**self._overrides.get(int(r["id"]), {}), **r} != self._overrides.get(int(r["id"]))]
+        if not new: return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._overrides_file.open("a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in new))
+        for r in new:
+            self._overrides.setdefault(int(r["id"]), {}).update(r)
+            self._cache.clear()
+
+    def _set(self, metas: List[Record]):
+        # swapped atomically so readers never need the lock
+        self._metas = metas
+        self._min_ids = [m["min_id"] for m in metas]
+        self._max_ids = [m["max_id"] for m in metas]
+
+    @property
+    def segments(self) -> List[Record]:
+        return list(self._metas)
+
+    @property
+    def max_id(self) -> int:
+        return self._max_ids[-1] if self._max_ids else 0
+
+    def add(self, records: List[Record]) -> Optional[Record]:
+        """Compress `records` into a new archive file and index it."""
+        records, orphans = apply_patches(records)
+        if not records or int(records[-1].get("id", 0)) > self.max_id:
+            with self._lock: self._add_overrides(orphans)
+        records = [r for r in records if int(r.get("id", 0)) > self.max_id]
+        if not records: return None
+        ids = [int(r.get("id", 0)) for r in records]
+        tss = [record_ts(r) for r in records]
+        types: Dict[str, int] = {}
+        for r in records: types[str(r.get("type"))] = types.get(str(r.get("type")), 0) + 1
+        name = f"{ids[0]:012d}-{ids[-1]:012d}.jsonl.gz"
+        meta = {"file": name, "min_id": ids[0], "max_id": ids[-1], "min_ts": min(tss), "max_ts": max(tss),
+                "count": len(records), "types": types}
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self.directory / (name + ".tmp")
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                f.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records))
+            tmp.replace(self.directory / name)
+            with self._index_file.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(meta, separators=(",", ":")) + "\n")
+            metas = self._metas + [meta]
+            if self.max_segments and len(metas) > self.max_segments:
+                for old in metas[:-self.max_segments]:
+                    try: (self.directory / old["file"]).unlink()
+                    except OSError: pass
+                metas = metas[-self.max_segments:]
+                self._rewrite_index(metas)
+            self._set(metas)
+        return meta
+
+    def _rewrite_index(self, metas: List[Record]):
+        tmp = self._index_file.with_suffix(".tmp")
+        tmp.write_text("".join(json.dumps(m, separators=(",", ":")) + "\n" for m in metas), encoding="utf-8")
+        tmp.replace(self._index_file)
+
+    def read(self, meta: Record) -> List[Record]:
+        """Decoded records of one archived segment (small LRU of recent reads)."""
+        name = str(meta["file"])
+        with self._lock:
+            if name in self._cache:
+                self._cache.move_to_end(name)
+                return self._cache[name]
+        try:
+            with gzip.open(self.directory / name, "rt", encoding="utf-8") as f: records = _read_jsonl(f)
+        except OSError:
+            return []
+        if self._overrides:
+            for r in records:
+                patch = self._overrides.get(int(r.get("id", 0)))
+                if patch: r.update({k: v for k, v in patch.items() if k not in ("op", "id")})
+        with self._lock:
+            self._cache[name] = records
+            while len(self._cache) > self.cache_segments: self._cache.popitem(last=False)
+        return records
+
+    def segments_before(self, upper_id: int) -> List[Record]:
+        """Segments holding ids < upper_id, newest first."""
+        metas = self._metas
+        return metas[:bisect_left(self._min_ids, upper_id)][::-1]
+
+    def segments_after(self, after_id: int) -> List[Record]:
+        """Segments holding ids > after_id, oldest first."""
+        metas = self._metas
+        return metas[bisect_right(self._max_ids, after_id):]
+
+    def reset(self):
+        with self._lock:
+            for m in self._metas:
+                try: (self.directory / m["file"]).unlink()
+                except OSError: pass
+            for f in (self._index_file, self._overrides_file):
+                try: f.unlink()
+                except OSError: pass
+            self._cache.clear()
+            self._overrides.clear()
+            self._set([])
+
+
+class SegmentJournal:
+    def __init__(self, directory: Path, segment_entries: int = 1000, retain_entries: int = 1000, fsync: bool = False,
+                 archive: Optional[SegmentArchive] = None):
+        self.directory = Path(directory)
+        self.segment_entries = max(1, int(segment_entries))
+        self.retain_entries = max(1, int(retain_entries))
+        self.fsync = fsync
+        self.archive = archive
+        self._segments: List[List[object]] = []   # [[seq, path, entry_count], ...] oldest first
+        self._fh: Optional[IO[str]] = None
+
+    # --- Segments ---
+    def _scan(self):
+        self._segments = []
+        if not self.directory.exists(): return
+        for p in self.directory.iterdir():
+            m = _SEGMENT_RE.match(p.name)
+            if m: self._segments.append([int(m.group(1)), p, 0])
+        self._segments.sort(key=lambda s: s[0])
+
+    def _open_segment(self, seq: int):
+        self.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"seg-{seq:06d}.jsonl"
+        self._segments.append([seq, path, 0])
+        self._fh = path.open("a", encoding="utf-8")
+
+    def _active(self) -> IO[str]:
+        if self._fh is None or not self._segments:
+            if self._segments and self._segments[-1][2] < self.segment_entries:
+                self._fh = self._segments[-1][1].open("a", encoding="utf-8")
+            else:
+                self._open_segment(self._segments[-1][0] + 1 if self._segments else 1)
+        return self._fh
+
+    @property
+    def entry_count(self) -> int:
+        return sum(s[2] for s in self._segments)
+
+    # --- Public API ---
+    def replay(self) -> List[Record]:
+        """Read every segment in order and return the retained tail of entries (patches applied)."""
+        self.close(); self._scan()
+        out: List[Record] = []
+        for i, seg in enumerate(self._segments):
+            try:
+                with seg[1].open("r", encoding="utf-8") as f: records = _read_jsonl(f)
+            except OSError: records = []
+            seg[2] = len(records)
+            out.extend(records)
+            closed = i < len(self._segments) - 1 or seg[2] >= self.segment_entries
+            if self.archive is not None and closed: self.archive.add(records)   # no-op if already archived
+        self.compact()
+        entries, _ = apply_patches(out)
+        return entries[-self.retain_entries:]
+
+    def append(self, records: List[Record]):
+        """Append records as JSONL lines, rolling to a new segment when full."""
+        i = 0
+        while i < len(records):
+            fh = self._active()
+            seg = self._segments[-1]
+            room = self.segment_entries - seg[2]
+            chunk = records[i:i + room]
+            fh.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in chunk))
+            fh.flush()
+            if self.fsync: os.fsync(fh.fileno())
+            seg[2] += len(chunk); i += len(chunk)
+            if seg[2] >= self.segment_entries:
+                self.close()
+                self._rotate(seg[1])
+                self.compact()
+
+    def _rotate(self, path: Path):
+        if self.archive is None: return
+        try:
+            with path.open("r", encoding="utf-8") as f: self.archive.add(_read_jsonl(f))
+        except OSError as e: print(f"❌ Failed to archive log segment {path.name}: {e}")
+
+    def compact(self):
+        """Drop closed segments whose entries are all outside the retention window."""
+        while len(self._segments) > 1 and self.entry_count - self._segments[0][2] >= self.retain_entries:
+            _, path, _ = self._segments.pop(0)
+            try: path.unlink()
+            except OSError: pass
+
+    def reset(self, records: Optional[List[Record]] = None):
+        """Delete all segments (and the archive) and optionally seed the journal with `records`."""
+        self.close(); self._scan()
+        if self.archive is not None: self.archive.reset()
+        for _, path, _ in self._segments:
+            try: path.unlink()
+            except OSError: pass
+        self._segments = []
+        if records: self.append(records)
+
+    def close(self):
+        if self._fh is not None:
+            try: self._fh.close()
+            except OSError: pass
+            self._fh = None
+
+
+class JournalWriter:
+    """
+    Background group-commit writer for a `SegmentJournal`.
+
+    `submit()` only enqueues; the writer thread wakes up, waits until either
+    `max_batch` operations are queued or `interval` seconds have passed since
+    the oldest one, then writes the whole batch with a single append (and at
+    most one fsync).
+    """
+
+    def __init__(self, journal: SegmentJournal, interval: float = 0.2, max_batch: int = 256):
+        self.journal = journal
+        self.interval = max(0.0, float(interval))
+        self.max_batch = max(1, int(max_batch))
+        self._pending: Deque[Tuple[str, object]] = deque()
+        self._cond = threading.Condition()
+        self._first_at = 0.0
+        self._submitted = self._written = 0
+        self._flush_waiters = 0
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+        self._stats = {"batches": 0, "errors": 0, "last_flush_ms": 0.0, "max_flush_ms": 0.0, "total_flush_ms": 0.0}
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._closing = False
+            self._thread = threading.Thread(target=self._run, name="log-journal-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, op: str, payload: object = None):
+        """Queue an operation: ("append", record), ("patch", {"id", ...fields}) or ("reset", records|None)."""
+        with self._cond:
+            self._ensure_thread()
+            if not self._pending: self._first_at = time.monotonic()
+            self._pending.append((op, payload))
+            self._submitted += 1
+            if len(self._pending) >= self.max_batch: self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Block until everything submitted so far has been written."""
+        with self._cond:
+            target = self._submitted
+            if self._written >= target: return True
+            self._flush_waiters += 1
+            self._cond.notify_all()
+            try: return self._cond.wait_for(lambda: self._written >= target, timeout)
+            finally: self._flush_waiters -= 1
+
+    def close(self, timeout: Optional[float] = 5.0):
+        self.flush(timeout)
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        if self._thread: self._thread.join(timeout)
+        self.journal.close()
+
+    def stats(self) -> Dict[str, object]:
+        with self._cond:
+            st = dict(self._stats)
+            st.update(queue_depth=len(self._pending), submitted=self._submitted, written=self._written,
+                      interval_ms=self.interval * 1000, max_batch=self.max_batch, fsync=self.journal.fsync)
+        total = st.pop("total_flush_ms")
+        st["avg_flush_ms"] = round(total / st["batches"], 3) if st["batches"] else 0.0
+        return st
+
+    def _take_batch(self) -> List[Tuple[str, object]]:
+        with self._cond:
+            while not self._pending and not self._closing:
+                self._cond.wait()
+            while (self._pending and len(self._pending) < self.max_batch
+                   and not self._flush_waiters and not self._closing):
+                remaining = self._first_at + self.interval - time.monotonic()
+                if remaining <= 0: break
+                self._cond.wait(remaining)
+            batch = [self._pending.popleft() for _ in range(min(self.max_batch, len(self._pending)))]
+            if self._pending: self._first_at = time.monotonic()
+            return batch
+
+    def _write(self, batch: List[Tuple[str, object]]):
+        records: List[Record] = []
+        by_id: Dict[object, Record] = {}   # entries / patches already in this batch
+        for op, payload in batch:
+            if op == "append":
+                records.append(payload); by_id[payload.get("id")] = payload
+            elif op == "patch":
+                # collapse into the entry or the earlier patch from this batch when possible
+                target = by_id.get(payload.get("id"))
+                if target is not None:
+                    target.update({k: v for k, v in payload.items() if k != "id"})
+                else:
+                    rec = {"op": "patch", **payload}
+                    records.append(rec); by_id[payload.get("id")] = rec
+            elif op == "reset":
+                records, by_id = [], {}   # anything queued before the reset is superseded by it
+                self.journal.reset(payload)
+        if records: self.journal.append(records)
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch and self._closing: return
+            t0 = time.perf_counter()
+            try: self._write(batch)
+            except Exception as e:
+                self._stats["errors"] += 1
+                print(f"❌ Failed to append logs: {e}")
+            ms = (time.perf_counter() - t0) * 1000
+            with self._cond:
+                self._written += len(batch)
+                self._stats["batches"] += 1
+                self._stats["last_flush_ms"] = round(ms, 3)
+                self._stats["max_flush_ms"] = round(max(self._stats["max_flush_ms"], ms), 3)
+                self._stats["total_flush_ms"] += ms
+                self._cond.notify_all()
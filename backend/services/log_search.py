@@ -0,0 +1,103 @@
+# backend/services/log_search.py
+"""
+Incremental inverted index over audit log entries.
+
+Tokens come from the message (and the latest wording of a coalesced
+repeat) and from context keys/values, so wallet
+addresses, subscription ids and session ids are all searchable. Postings are
+insertion-ordered dicts keyed by log id: appends and evictions are O(1) per
+token, and walking a posting list yields ids in log order.
+"""
+from __future__ import annotations
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+_TOKEN_RE = re.compile(r"[0-9a-z_]{2,}")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _walk(value: object, out: List[str]):
+    if isinstance(value, dict):
+        for k, v in value.items():
+            out.append(str(k)); _walk(v, out)
+    elif isinstance(value, (list, tuple)):
+        for v in value: _walk(v, out)
+    elif value is not None:
+        out.append(str(value))
+
+
+def entry_tokens(entry: Dict[str, object]) -> Tuple[str, ...]:
+    parts: List[str] = [str(entry.get("message", "")), str(entry.get("last_message", ""))]
+    _walk(entry.get("context"), parts)
+    return tuple(dict.fromkeys(t for p in parts for t in tokenize(p)))
+
+
+class InvertedIndex:
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, None]] = {}
+        self._docs: Dict[int, Tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, doc_id: int, entry: Dict[str, object]):
+        """Index (or re-index) an entry; ids must be added in ascending order."""
+        tokens = entry_tokens(entry)
+        old = self._docs.get(doc_id, ())
+        for t in tokens:
+            if t not in old: self._postings.setdefault(t, {})[doc_id] = None
+        self._docs[doc_id] = tuple(dict.fromkeys(old + tokens))
+
+    def update(self, doc_id: int, entry: Dict[str, object]):
+        """Replace an indexed entry's tokens (e.g. a coalesced repeat); postings stay in id order."""
+        old = self._docs.get(doc_id)
+        if old is None: return
+        tokens = entry_tokens(entry)
+        keep, had = set(tokens), set(old)
+        for t in old:
+            if t in keep: continue
+            p = self._postings.get(t)
+            if p is None: continue
+            p.pop(doc_id, None)
+            if not p: del self._postings[t]
+        for t in tokens:
+            if t in had: continue
+            p = self._postings.setdefault(t, {})
+            p[doc_id] = None
+            if max(p) != doc_id:  # an older entry gained a token newer entries already have
+                self._postings[t] = dict.fromkeys(sorted(p))
+        self._docs[doc_id] = tokens
+
+    def remove(self, doc_id: int):
+        for t in self._docs.pop(doc_id, ()):
+            p = self._postings.get(t)
+            if p is None: continue
+            p.pop(doc_id, None)
+            if not p: del self._postings[t]
+
+    def clear(self):
+        self._postings.clear(); self._docs.clear()
+
+    def search(self, query: str, limit: int = 50, accept: Optional[Callable[[int], bool]] = None) -> List[int]:
+        """
+        Newest `limit` ids (ascending) containing every query term. The rarest
+        term's postings are walked newest-first and probed against the others.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or limit <= 0: return []
+        lists = sorted((self._postings.get(t, {}) for t in terms), key=len)
+        if not lists[0]: return []
+        rarest, rest = lists[0], lists[1:]
+        out: List[int] = []
+        for doc_id in reversed(rarest):
+            if all(doc_id in p for p in rest) and (accept is None or accept(doc_id)):
+                out.append(doc_id)
+                if len(out) >= limit: break
+        out.sort()
+        return out
+
+    def stats(self) -> Dict[str, int]:
+        return {"documents": len(self._docs), "terms": len(self._postings)}
@@ -1,60 +1,263 @@
 # backend/services/log_service.py
 from __future__ import annotations
-import json, os, threading
+import atexit, json, math, os, re, threading, time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence, Union
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+from backend.services.live_tail import Broadcaster
+from backend.services.log_journal import JournalWriter, SegmentArchive, SegmentJournal, record_ts
+from backend.services.log_search import InvertedIndex
 
 LOG_FILE = Path(os.getenv("AUDIT_LOG_FILE", Path(__file__).resolve().parents[2] / "audit_logs.json"))
 LOG_MAX_ENTRIES = int(os.getenv("LOG_MAX_ENTRIES", "1000"))
+# Append-only journal (JSONL segments); LOG_FILE is only read once to migrate legacy data
+LOG_JOURNAL_DIR = Path(os.getenv("LOG_JOURNAL_DIR", LOG_FILE.parent / f"{LOG_FILE.stem}.journal"))
+LOG_SEGMENT_ENTRIES = int(os.getenv("LOG_SEGMENT_ENTRIES", str(max(1, LOG_MAX_ENTRIES // 4))))
+# Group-commit writer: flush after LOG_FLUSH_INTERVAL_MS or LOG_FLUSH_MAX_BATCH queued entries
+LOG_FLUSH_INTERVAL_MS = float(os.getenv("LOG_FLUSH_INTERVAL_MS", "200"))
+LOG_FLUSH_MAX_BATCH = int(os.getenv("LOG_FLUSH_MAX_BATCH", "256"))
+LOG_FSYNC = os.getenv("LOG_FSYNC", "false").lower() == "true"
+# Closed segments are rotated into gzip archives so history beyond the hot window stays queryable
+LOG_ARCHIVE_DIR = Path(os.getenv("LOG_ARCHIVE_DIR", LOG_FILE.parent / f"{LOG_FILE.stem}.archive"))
+LOG_ARCHIVE_MAX_SEGMENTS = int(os.getenv("LOG_ARCHIVE_MAX_SEGMENTS", "0"))  # 0 = unlimited
+# Identical (type, message template, context) entries within this many seconds collapse into one; 0 disables
+LOG_COALESCE_WINDOW = float(os.getenv("LOG_COALESCE_WINDOW", "300"))
 
 class LogType(str, Enum):
     INFO="info"; SUCCESS="success"; WARNING="warning"; ERROR="error"; ACTION="action"
 
 LogEntry = Dict[str, object]
+# Hot window: _logs[_head:] are live entries, _ts is their epoch "ts" column (non-decreasing),
+# and _by_type maps type -> ascending absolute positions (absolute = _base + list index).
 _logs: List[LogEntry] = []
+_ts: List[float] = []
+_by_type: Dict[str, List[int]] = {}
+_base = _head = 0
+# Full-text index over the hot window, kept in step with _index eviction
+_search = InvertedIndex()
+# Coalescing: key -> entry still accepting repeats, in first-seen order
+_open: "OrderedDict[tuple, LogEntry]" = OrderedDict()
+_NUM_RE = re.compile(r"(?<!\w)\d+(?:[.,]\d+)*(?!\w)")
 _next_id, _lock = 1, threading.RLock()
+_archive = SegmentArchive(LOG_ARCHIVE_DIR, max_segments=LOG_ARCHIVE_MAX_SEGMENTS)
+_writer = JournalWriter(
+    SegmentJournal(LOG_JOURNAL_DIR, segment_entries=LOG_SEGMENT_ENTRIES, retain_entries=LOG_MAX_ENTRIES,
+                   fsync=LOG_FSYNC, archive=_archive),
+    interval=LOG_FLUSH_INTERVAL_MS / 1000, max_batch=LOG_FLUSH_MAX_BATCH,
+)
+atexit.register(_writer.close)
+# New entries are pushed to SSE subscribers of /api/logs/stream
+log_stream = Broadcaster()
+
+_TS_FMT = "%Y-%m-%d %H:%M:%S"
+
+def _entry_ts(e: LogEntry) -> float: return record_ts(e, default=_ts[-1] if _ts else 0.0)
 
-def _now() -> str: return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+def _entry_id(e: LogEntry) -> int: return int(e.get("id", 0))
 
-def _save():
-    try:
-        LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
-        tmp = LOG_FILE.with_suffix(".tmp")
-        with tmp.open("w", encoding="utf-8") as f: json.dump(_logs, f, indent=2)
-        tmp.replace(LOG_FILE)
-    except Exception as e: print(f"❌ Failed to save logs: {e}")
+def _reset_index():
+    global _logs, _ts, _by_type, _base, _head
+    _logs, _ts, _by_type, _base, _head = [], [], {}, 0, 0
+    _search.clear(); _open.clear()
+
+def _index(entry: LogEntry):
+    """Append to the hot window and its indexes, evicting past LOG_MAX_ENTRIES."""
+    global _base, _head
+    ts = max(_entry_ts(entry), _ts[-1]) if _ts else _entry_ts(entry)
+    entry["ts"] = ts
+    _by_type.setdefault(str(entry.get("type")), []).append(_base + len(_logs))
+    _logs.append(entry); _ts.append(ts)
+    _search.add(_entry_id(entry), entry)
+    if len(_logs) - _head > LOG_MAX_ENTRIES:
+        _search.remove(_entry_id(_logs[_head])); _head += 1
+    if _head >= max(LOG_MAX_ENTRIES, 1024):
+        # amortized compaction of the evicted prefix
+        del _logs[:_head]; del _ts[:_head]
+        _base += _head; _head = 0
+        for b in _by_type.values(): del b[:bisect_left(b, _base)]
 
 def load_logs():
-    global _logs, _next_id
-    try:
-        if LOG_FILE.exists(): _logs = json.loads(LOG_FILE.read_text())
-    except: _logs = []
-    _next_id = (max((e.get("id",0) for e in _logs), default=0) + 1) if _logs else 1
+    global _next_id
+    with _lock:
+        _writer.flush()
+        try:
+            logs = _writer.journal.replay()
+            if not logs and LOG_FILE.exists():
+                # one-time migration from the legacy whole-file JSON array; the file is renamed
+                # so an emptied journal (clear_logs) doesn't bring it back
+                logs = json.loads(LOG_FILE.read_text())[-LOG_MAX_ENTRIES:]
+                _writer.journal.append(logs)
+                LOG_FILE.replace(LOG_FILE.with_name(LOG_FILE.name + ".migrated"))
+        except Exception: logs = []
+        _reset_index()
+        for e in logs: _index(e)
+        _next_id = (max((e.get("id",0) for e in logs), default=0) + 1) if logs else 1
+
+def _coalesce_key(lvl: str, msg: str, ctx: Optional[dict]) -> tuple:
+    return (lvl, _NUM_RE.sub("#", msg), json.dumps(ctx, sort_keys=True, default=str) if ctx else "")
+
+def _repeat(prev: LogEntry, msg: str, ts: float) -> LogEntry:
+    """
+    Fold a repeat into `prev` and re-index it; only the changed fields are
+    journaled, and SSE subscribers get them as a `log_patch` event.
+    """
+    prev["repeat"] = int(prev.get("repeat", 1)) + 1
+    prev["last_timestamp"] = datetime.fromtimestamp(ts).strftime(_TS_FMT)
+    prev["last_ts"] = round(ts, 3)
+    if msg != prev["message"]: prev["last_message"] = msg
+    patch = {k: prev[k] for k in ("repeat", "last_timestamp", "last_ts", "last_message") if k in prev}
+    _search.update(_entry_id(prev), prev)
+    _writer.submit("patch", {"id": prev["id"], **patch})
+    log_stream.publish({"log_id": prev["id"], "type": prev["type"], **patch})   # no "id": unsequenced
+    return prev
 
 def add_log(t: Union[str,LogType], msg: str, ctx: Optional[dict]=None) -> LogEntry:
+    """
+    Record an entry. A repeat of an entry with the same type, message template
+    (numbers masked) and context within LOG_COALESCE_WINDOW seconds is folded
+    into it instead: `repeat` counts occurrences, `timestamp`/`last_timestamp`
+    span them and `last_message` keeps the latest wording.
+    """
     global _next_id
     lvl = LogType(str(t).lower()) if not isinstance(t, LogType) else t
-    entry = {"id": _next_id, "type": lvl.value, "message": msg, "timestamp": _now(), **({"context":ctx} if ctx else {})}
     with _lock:
-        _logs.append(entry); _next_id += 1
-        if len(_logs) > LOG_MAX_ENTRIES: _logs[:] = _logs[-LOG_MAX_ENTRIES:]
-        _save()
+        ts = max(time.time(), _ts[-1]) if _ts else time.time()
+        key = None
+        if LOG_COALESCE_WINDOW > 0:
+            while _open and ts - next(iter(_open.values()))["ts"] > LOG_COALESCE_WINDOW: _open.popitem(last=False)
+            key = _coalesce_key(lvl.value, msg, ctx)
+            prev = _open.get(key)
+            if prev is not None and _head < len(_logs) and _entry_id(prev) >= _entry_id(_logs[_head]):
+                return _repeat(prev, msg, ts)
+            _open.pop(key, None)
+        entry = {"id": _next_id, "type": lvl.value, "message": msg,
+                 "timestamp": datetime.fromtimestamp(ts).strftime(_TS_FMT), "ts": round(ts, 3), **({"context":ctx} if ctx else {})}
+        _next_id += 1
+        _index(entry)
+        if key is not None: _open[key] = entry
+        _writer.submit("append", dict(entry))
+        log_stream.publish(entry)
     return entry
 
-def get_logs(limit:int=50, types:Optional[Sequence[Union[str,LogType]]]=None, since:Optional[datetime]=None) -> List[LogEntry]:
-    with _lock: logs=list(_logs)
-    if types: 
-        want={LogType(str(t).lower()).value if not isinstance(t,LogType) else t.value for t in types}
-        logs=[e for e in logs if e.get("type") in want]
-    if since:
-        logs=[e for e in logs if datetime.strptime(e["timestamp"], "%Y-%m-%d %H:%M:%S")>since]
-    return logs[-limit:]
+def _want(types: Optional[Sequence[Union[str,LogType]]]) -> Optional[set]:
+    if not types: return None
+    return {LogType(str(t).lower()).value if not isinstance(t,LogType) else t.value for t in types}
+
+def _hot_query(limit:int, want:Optional[set], thr:Optional[float], after_id:Optional[int], before_id:Optional[int]):
+    """Query the in-memory window; returns (entries, reaches_window_start). Caller holds _lock."""
+    lo, hi = _head, len(_logs)
+    if thr is not None: lo = bisect_left(_ts, thr, lo=_head)
+    if after_id is not None: lo = max(lo, bisect_right(_logs, after_id, lo=_head, key=_entry_id))
+    if before_id is not None: hi = bisect_left(_logs, before_id, lo=_head, key=_entry_id)
+    if lo >= hi: return [], lo == _head
+    forward = after_id is not None
+    if not want:
+        return (_logs[lo:min(hi, lo + limit)] if forward else _logs[max(lo, hi - limit):hi]), lo == _head
+    picked = []
+    for t in want:
+        b = _by_type.get(t)
+        if not b: continue
+        i, j = bisect_left(b, _base + lo), bisect_left(b, _base + hi)
+        picked.extend(b[i:min(j, i + limit)] if forward else b[max(i, j - limit):j])
+    picked.sort()
+    picked = picked[:limit] if forward else picked[-limit:]
+    return [_logs[p - _base] for p in picked], lo == _head
+
+def _archive_query(limit:int, want:Optional[set], thr:Optional[float], after_id:Optional[int], upper_id:int) -> List[LogEntry]:
+    """Query archived segments for ids in (after_id, upper_id), using the sidecar index to skip segments."""
+    forward = after_id is not None
+    def ok(e):
+        return (not want or e.get("type") in want) and (thr is None or record_ts(e) >= thr) \
+            and _entry_id(e) < upper_id and (after_id is None or _entry_id(e) > after_id)
+    out: List[LogEntry] = []
+    segs = _archive.segments_after(after_id) if forward else _archive.segments_before(upper_id)
+    for m in segs:
+        if thr is not None and m["max_ts"] < thr:
+            if forward: continue
+            break   # newest-first: everything older is before `since` too
+        if forward and m["min_id"] >= upper_id: break
+        if want and not any(m["types"].get(t) for t in want): continue
+        rows = [e for e in _archive.read(m) if ok(e)]
+        if forward: out.extend(rows[:limit - len(out)])
+        else: out[:0] = rows[-(limit - len(out)):]
+        if len(out) >= limit: break
+    return out
+
+def get_logs(limit:int=50, types:Optional[Sequence[Union[str,LogType]]]=None, since:Optional[datetime]=None,
+             after_id:Optional[int]=None, before_id:Optional[int]=None) -> List[LogEntry]:
+    """
+    Newest `limit` entries (oldest first), optionally filtered by type and `since`.
+
+    Keyset cursors: `before_id` pages backwards (newest `limit` entries with a
+    smaller id); `after_id` pages forwards (oldest `limit` entries with a larger id).
+    `since`/cursors are bisects on the ts/id columns (`since` matches whole-second
+    timestamps strictly after it) and `types` merges the per-type position buckets,
+    so the cost is O(log n + limit) rather than a scan of the window. Anything
+    older than the hot window is read from the archived segments that can match.
+    """
+    if limit <= 0: return []
+    want = _want(types)
+    thr = math.floor(since.timestamp()) + 1 if since else None
+    with _lock:
+        hot, reaches_start = _hot_query(limit, want, thr, after_id, before_id)
+        hot_min = _entry_id(_logs[_head]) if _head < len(_logs) else _next_id
+    upper = hot_min if before_id is None else min(hot_min, before_id)
+    if after_id is not None:
+        if after_id + 1 >= upper or not _archive.max_id: return hot
+        return (_archive_query(limit, want, thr, after_id, upper) + hot)[:limit]
+    if len(hot) >= limit or not reaches_start or not _archive.max_id: return hot
+    return _archive_query(limit - len(hot), want, thr, None, upper) + hot
+
+def _lookup(log_id: int) -> Optional[LogEntry]:
+    """Entry with `log_id` in the hot window (caller holds _lock)."""
+    i = bisect_left(_logs, log_id, lo=_head, key=_entry_id)
+    return _logs[i] if i < len(_logs) and _entry_id(_logs[i]) == log_id else None
+
+def search_logs(q: str, limit:int=50, types:Optional[Sequence[Union[str,LogType]]]=None,
+                since:Optional[datetime]=None, until:Optional[datetime]=None) -> List[LogEntry]:
+    """
+    Entries in the hot window containing every term of `q` (message or context),
+    newest `limit` in id order, optionally filtered by type and time range.
+    """
+    want = _want(types)
+    lo = math.floor(since.timestamp()) + 1 if since else None
+    hi = until.timestamp() if until else None
+    with _lock:
+        def accept(log_id: int) -> bool:
+            e = _lookup(log_id)
+            return e is not None and (not want or e.get("type") in want) \
+                and (lo is None or e["ts"] >= lo) and (hi is None or e["ts"] <= hi)
+        return [_lookup(i) for i in _search.search(q, limit=limit, accept=accept)]
+
+def iter_logs(types:Optional[Sequence[Union[str,LogType]]]=None, since:Optional[datetime]=None,
+              after_id:Optional[int]=None, before_id:Optional[int]=None, batch:int=500) -> Iterator[LogEntry]:
+    """Yield matching entries oldest first, one keyset page at a time (no full copy)."""
+    cursor = after_id if after_id is not None else 0
+    while True:
+        page = get_logs(limit=batch, types=types, since=since, after_id=cursor, before_id=before_id)
+        if not page: return
+        yield from page
+        cursor = _entry_id(page[-1])
 
 def clear_logs(): 
-    global _logs,_next_id
-    with _lock: _logs, _next_id=[],1; _save()
+    global _next_id
+    with _lock: _reset_index(); _next_id=1; _writer.submit("reset")
+
+def flush_logs(timeout: Optional[float]=5.0) -> bool:
+    """Block until every queued entry has reached the journal."""
+    return _writer.flush(timeout)
+
+def get_log_stats() -> Dict[str, object]:
+    """Writer queue depth and flush latency, in-memory window size and archive coverage."""
+    with _lock: n=len(_logs)-_head; search=_search.stats()
+    segs = _archive.segments
+    archive = {"segments": len(segs), "entries": sum(m["count"] for m in segs),
+               "min_id": segs[0]["min_id"] if segs else None, "max_id": segs[-1]["max_id"] if segs else None}
+    return {"entries": n, "next_id": _next_id, "writer": _writer.stats(), "archive": archive, "search": search}
 
 # Convenience
 def log_info(msg:str,ctx:dict=None): return add_log(LogType.INFO,msg,ctx)
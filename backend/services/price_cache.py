@@ -0,0 +1,180 @@
+# backend/services/price_cache.py
+"""
+Shared USD price cache, keyed by CoinGecko coin id.
+
+Within PRICE_CACHE_TTL a cached price is served as-is. For another
+PRICE_CACHE_STALE seconds it is still served, but a background refresh is
+started (at most one per key), so readers never wait on CoinGecko for a
+warm key. Older entries count as misses and are fetched inline. The cache
+holds at most PRICE_CACHE_MAX coins and evicts the least recently used one.
+
+Used by crypto_service.get_price (sync) and routes/prices (async).
+"""
+from __future__ import annotations
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+PRICE_CACHE_TTL = float(os.getenv("PRICE_CACHE_TTL", "60"))
+PRICE_CACHE_STALE = float(os.getenv("PRICE_CACHE_STALE", "300"))
+PRICE_CACHE_MAX = int(os.getenv("PRICE_CACHE_MAX", "512"))
+
+
+class PriceCache:
+    def __init__(self, ttl: float = PRICE_CACHE_TTL, stale: float = PRICE_CACHE_STALE, max_entries: int = PRICE_CACHE_MAX):
+        self.ttl, self.stale, self.max_entries = ttl, stale, max(1, max_entries)
+        self._data: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # key -> (price, fetched_at)
+        self._refreshing: Set[str] = set()
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0,
+                       "refresh_errors": 0, "evictions": 0, "max_stale_age_s": 0.0}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # --- primitives ---
+    def put(self, key: str, price: float):
+        with self._lock:
+            self._data[key] = (float(price), time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def peek(self, key: str) -> Optional[Tuple[float, float]]:
+        """(price, age in seconds) regardless of freshness, or None. Does not count as a read."""
+        with self._lock:
+            item = self._data.get(key)
+        return (item[0], time.time() - item[1]) if item else None
+
+    def _lookup(self, key: str) -> Tuple[Optional[float], bool]:
+        """(price or None, needs refresh). Updates hit/miss metrics."""
+        with self._lock:
+            item = self._data.get(key)
+            age = time.time() - item[1] if item else None
+            if item is None or age > self.ttl + self.stale:
+                self._stats["misses"] += 1
+                return None, False
+            self._data.move_to_end(key)
+            if age <= self.ttl:
+                self._stats["hits"] += 1
+                return item[0], False
+            self._stats["stale_hits"] += 1
+            self._stats["max_stale_age_s"] = round(max(self._stats["max_stale_age_s"], age), 3)
+            if key in self._refreshing:
+                return item[0], False
+            self._refreshing.add(key)
+            return item[0], True
+
+    def _store(self, key: str, price: Optional[float], error: bool = False):
+        with self._lock:
+            self._refreshing.discard(key)
+            self._stats["refreshes"] += 1
+            if error:
+                self._stats["refresh_errors"] += 1
+        if price is not None:
+            self.put(key, price)
+
+    # --- sync ---
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="price-refresh")
+            return self._pool
+
+    def _refresh(self, key: str, fetch: Callable[[], Optional[float]]):
+        try:
+            self._store(key, fetch())
+        except Exception:
+            self._store(key, None, error=True)
+
+    def get(self, key: str, fetch: Callable[[], Optional[float]]) -> Optional[float]:
+        """Cached price, refreshing in the background when stale; fetches inline on a miss (errors propagate)."""
+        price, refresh = self._lookup(key)
+        if refresh:
+            self._executor().submit(self._refresh, key, fetch)
+        if price is not None:
+            return price
+        price = fetch()
+        if price is not None:
+            self.put(key, price)
+        return price
+
+    def _refresh_many(self, keys: List[str], fetch_many: Callable[[List[str]], Dict[str, float]]):
+        try:
+            got = fetch_many(keys)
+        except Exception:
+            got, error = {}, True
+        else:
+            error = False
+        for k in keys:
+            self._store(k, got.get(k), error=error)
+
+    def get_many(self, keys: Iterable[str], fetch_many: Callable[[List[str]], Dict[str, float]]) -> Dict[str, float]:
+        """
+        Batched get(): cached keys are served (stale ones refreshed together in
+        one background call) and all misses are fetched with one inline
+        `fetch_many(missing)` call. Keys the upstream does not know are left out.
+        """
+        out: Dict[str, float] = {}
+        missing: List[str] = []
+        refresh: List[str] = []
+        for k in dict.fromkeys(keys):
+            price, stale = self._lookup(k)
+            if price is None:
+                missing.append(k)
+            else:
+                out[k] = price
+                if stale:
+                    refresh.append(k)
+        if refresh:
+            self._executor().submit(self._refresh_many, refresh, fetch_many)
+        if missing:
+            got = fetch_many(missing)
+            for k in missing:
+                if got.get(k) is not None:
+                    self.put(k, got[k])
+                    out[k] = float(got[k])
+        return out
+
+    # --- async ---
+    async def _arefresh(self, key: str, fetch: Callable[[], Awaitable[Optional[float]]]):
+        try:
+            self._store(key, await fetch())
+        except Exception:
+            self._store(key, None, error=True)
+
+    async def aget(self, key: str, fetch: Callable[[], Awaitable[Optional[float]]]) -> Optional[float]:
+        """Async counterpart of get(); the background refresh runs as a task on the current loop."""
+        price, refresh = self._lookup(key)
+        if refresh:
+            task = asyncio.get_running_loop().create_task(self._arefresh(key, fetch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        if price is not None:
+            return price
+        price = await fetch()
+        if price is not None:
+            self.put(key, price)
+        return price
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            reads = self._stats["hits"] + self._stats["stale_hits"] + self._stats["misses"]
+            served = self._stats["hits"] + self._stats["stale_hits"]
+            return {**self._stats, "size": len(self._data), "max_entries": self.max_entries,
+                    "ttl_s": self.ttl, "stale_s": self.stale,
+                    "hit_ratio": round(served / reads, 4) if reads else None}
+
+
+prices = PriceCache()
@@ -0,0 +1,117 @@
+# backend/services/recommendations.py
+"""
+Recommendation tables for alerts, compiled once.
+
+Each table is an ordered list of (conditions, payload) rules; the first rule
+whose conditions all appear in the message wins, exactly like the if/elif
+chains it replaces. A table compiles to a single regex of anchored lookahead
+alternatives, one named empty group per rule, so matching is one `re.match`
+no matter how many rules there are. Results are memoized per message
+template (numbers masked) in bounded LRUs as immutable tuples; callers get
+fresh lists and plan dicts built from them.
+"""
+from __future__ import annotations
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+RECOMMENDATION_CACHE_SIZE = int(os.getenv("RECOMMENDATION_CACHE_SIZE", "1024"))
+_NUM_RE = re.compile(r"(?<!\w)\d+(?:[.,]\d+)*(?!\w)")
+
+# A condition is a tuple of alternatives; a rule matches when every condition does
+Condition = Tuple[str, ...]
+
+
+def message_template(msg: str) -> str:
+    """Message with standalone numbers masked, e.g. 'Current: 111145.00' -> 'Current: #'."""
+    return _NUM_RE.sub("#", msg or "")
+
+
+class Matcher:
+    def __init__(self, rules: Sequence[Tuple[Sequence[Condition], object]], default: object = None):
+        self.payloads = [p for _, p in rules]
+        self.default = default
+        alts = []
+        for i, (conds, _) in enumerate(rules):
+            looks = "".join("(?=.*?(?:%s))" % "|".join(re.escape(a) for a in c) for c in conds)
+            alts.append(f"{looks}(?P<r{i}>)")
+        self._re = re.compile("(?:%s)" % "|".join(alts), re.IGNORECASE | re.DOTALL) if alts else None
+
+    def match(self, text: str) -> object:
+        m = self._re.match(text or "") if self._re else None
+        return self.payloads[int(m.lastgroup[1:])] if m else self.default
+
+
+# --- Advisor-style enrichment (alert_watcher) ---
+ADVISOR_RULES: List[Tuple[List[Condition], List[str]]] = [
+    ([("btc crossed", "eth price", "dropped")], [
+        "✋ Hold position — Ride out short-term volatility.",
+        "💱 Sell 30% to USDC — Reduce exposure while keeping upside.",
+        "💸 Cash out to PayPal — Fully hedge by moving to fiat."
+    ]),
+    ([("wallet",), ("low",)], [
+        "🟡 Mint 50 USDC via Circle — Restores balance above $50.",
+        "🔀 Transfer from backup wallet — Avoid minting fees."
+    ]),
+    ([("subscription",)], [
+        "🔄 Resume subscription — Keep features uninterrupted.",
+        "⬇️ Downgrade to Free — Save costs until next salary credit.",
+        "🔁 Renew subscription — Pre-pay for next cycle."
+    ]),
+    ([("transaction failed",)], [
+        "⛽ Retry with higher gas — +20% gas ensures confirmation.",
+        "✂️ Retry smaller amount — Reduce transfer size.",
+        "🔀 Use backup wallet — Ensure transfer completes."
+    ]),
+    ([("circle",), ("low",)], [
+        "💳 Top-up with 100 USDC — Maintain $100 minimum balance.",
+        "🔁 Redeem USDC back — Rebalance treasury."
+    ]),
+]
+
+# --- Short recommendations and plans (alert_service) ---
+ACTION_RULES: List[Tuple[List[Condition], List[str]]] = [
+    ([("usdc low",)], ["Top up USDC manually", "Transfer from backup wallet"]),
+    ([("eth critically low",)], ["Fund ETH from faucet", "Transfer ETH from backup"]),
+    ([("subscription cancelled",)], ["Resume subscription", "Downgrade to Free plan"]),
+    ([("subscription expiring",)], ["Renew subscription now", "Switch to monthly plan"]),
+]
+DEFAULT_ACTIONS = ["Investigate issue manually"]
+
+_advisor = Matcher(ADVISOR_RULES)
+_actions = Matcher(ACTION_RULES, DEFAULT_ACTIONS)
+
+
+def summarize(recommendations: Sequence[str]) -> str:
+    """Short action list for summaries: the part of each recommendation before the dash."""
+    return ", ".join(r.split("—")[0].strip() for r in recommendations)
+
+
+@lru_cache(maxsize=RECOMMENDATION_CACHE_SIZE)
+def advisor_bundle(template: str) -> Optional[Tuple[Tuple[str, ...], str]]:
+    """(recommendations, summary actions) for a message template, or None."""
+    recs = _advisor.match(template)
+    return (tuple(recs), summarize(recs)) if recs is not None else None
+
+
+@lru_cache(maxsize=RECOMMENDATION_CACHE_SIZE)
+def action_bundle(template: str) -> Tuple[str, ...]:
+    """Short recommendations for a message template."""
+    return tuple(_actions.match(template))
+
+
+def plans_for(recs: Sequence[str]) -> List[Dict]:
+    """One agent plan per recommendation; new dicts on every call."""
+    return [
+        {
+            "option": f"Plan {i}",
+            "recommendation": r,
+            "steps": [{"tool": "ask_agent", "args": {"query": r}}],
+        }
+        for i, r in enumerate(recs, start=1)
+    ]
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    return {name: fn.cache_info()._asdict() for name, fn in (("advisor", advisor_bundle), ("actions", action_bundle))}
@@ -0,0 +1,111 @@
+# backend/services/single_flight.py
+"""
+Single-flight request coalescing.
+
+Concurrent callers asking for the same (provider, resource) while a fetch is
+already running wait for that fetch and share its result (or exception)
+instead of starting their own, so a cache expiry turns N simultaneous
+upstream calls into one. `do()` is for sync callers (threads), `ado()` for
+coroutines on an event loop; the two are tracked separately. If an async
+leader is cancelled (e.g. its client disconnected), its waiters are not: one
+of them takes over the fetch.
+"""
+from __future__ import annotations
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+Key = Tuple[str, Hashable]  # (provider, resource)
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _LeaderCancelled(Exception):
+    """Set on a shared future whose leader was cancelled; waiters retry and one of them leads."""
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Key, _Call] = {}
+        self._futures: Dict[Key, asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, key: Key, leader: bool):
+        s = self._stats.setdefault(str(key[0]), {"calls": 0, "upstream": 0, "coalesced": 0})
+        s["calls"] += 1
+        s["upstream" if leader else "coalesced"] += 1
+
+    def do(self, key: Key, fn: Callable[[], Any]) -> Any:
+        """Run fn() unless the same key is already in flight; then wait for and share that result."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            self._count(key, leader)
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    async def ado(self, key: Key, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async do(): coalesces coroutines on the same event loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                fut = self._futures.get(key)
+                leader = fut is None or fut.done() or fut.get_loop() is not loop
+                if leader:
+                    fut = self._futures[key] = loop.create_future()
+                self._count(key, leader)
+            if leader:
+                break
+            try:
+                return await asyncio.shield(fut)
+            except _LeaderCancelled:
+                continue
+        try:
+            result = await fn()
+            fut.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            fut.set_exception(_LeaderCancelled())
+            fut.exception()
+            raise
+        except BaseException as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved when nobody was waiting
+            raise
+        finally:
+            with self._lock:
+                if self._futures.get(key) is fut:
+                    del self._futures[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            providers = {p: dict(s) for p, s in self._stats.items()}
+            in_flight = len(self._calls) + sum(1 for f in self._futures.values() if not f.done())
+        totals = {k: sum(s[k] for s in providers.values()) for k in ("calls", "upstream", "coalesced")}
+        return {**totals, "in_flight": in_flight, "providers": providers}
+
+
+flights = SingleFlight()
@@ -0,0 +1,101 @@
+# backend/services/token_registry.py
+"""
+ERC-20 token registry.
+
+Keeps three bounded LRUs of TOKEN_CACHE_MAX entries each:
+- checksummed addresses, so `Web3.to_checksum_address` runs once per address;
+- contract objects per (web3 client, token), so the ABI is parsed once;
+- token metadata (`symbol()` and `decimals()`), fetched once per token.
+
+With the metadata cached, a token balance costs only its `balanceOf` call.
+Metadata fetches go through a caller-supplied `fetch(checksummed_address)`,
+the same way the price cache takes its fetcher.
+"""
+from __future__ import annotations
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from web3 import Web3
+
+TOKEN_CACHE_MAX = int(os.getenv("TOKEN_CACHE_MAX", "1024"))
+
+
+@dataclass(frozen=True)
+class TokenMeta:
+    address: str   # checksummed
+    symbol: str
+    decimals: int
+
+    def to_units(self, raw: int) -> float:
+        return raw / 10 ** self.decimals
+
+
+class TokenRegistry:
+    def __init__(self, max_entries: int = TOKEN_CACHE_MAX):
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._tables: Dict[str, "OrderedDict[Hashable, Any]"] = {
+            "checksum": OrderedDict(), "contract": OrderedDict(), "meta": OrderedDict()}
+        self._stats = {name: {"hits": 0, "misses": 0} for name in self._tables}
+
+    def _get(self, table: str, key: Hashable) -> Any:
+        with self._lock:
+            data = self._tables[table]
+            value = data.get(key)
+            if value is None:
+                self._stats[table]["misses"] += 1
+                return None
+            data.move_to_end(key)
+            self._stats[table]["hits"] += 1
+            return value
+
+    def _put(self, table: str, key: Hashable, value: Any) -> Any:
+        with self._lock:
+            data = self._tables[table]
+            data[key] = value
+            data.move_to_end(key)
+            while len(data) > self.max_entries:
+                data.popitem(last=False)
+        return value
+
+    def checksum(self, address: str) -> str:
+        """Memoized Web3.to_checksum_address (raises ValueError on a malformed address)."""
+        key = address.lower()
+        return self._get("checksum", key) or self._put("checksum", key, Web3.to_checksum_address(key))
+
+    def contract(self, w3: Any, token: str, abi: list) -> Any:
+        """The contract object for `token` on client `w3` (Web3 or AsyncWeb3), built once."""
+        cs = self.checksum(token)
+        cached = self._get("contract", (id(w3), cs))
+        if cached is not None and cached[0] is w3:
+            return cached[1]
+        return self._put("contract", (id(w3), cs), (w3, w3.eth.contract(address=cs, abi=abi)))[1]
+
+    def peek(self, token: str) -> Optional[TokenMeta]:
+        """Cached metadata or None; never fetches."""
+        with self._lock:
+            return self._tables["meta"].get(token.lower())
+
+    def meta(self, token: str, fetch: Callable[[str], TokenMeta]) -> TokenMeta:
+        """Token metadata, calling fetch(checksummed address) on a miss (errors propagate, nothing cached)."""
+        meta = self._get("meta", token.lower())
+        if meta is None:
+            meta = self._put("meta", token.lower(), fetch(self.checksum(token)))
+        return meta
+
+    def clear(self):
+        with self._lock:
+            for data in self._tables.values():
+                data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = {name: {**self._stats[name], "size": len(data)} for name, data in self._tables.items()}
+        out["max_entries"] = self.max_entries
+        return out
+
+
+tokens = TokenRegistry()
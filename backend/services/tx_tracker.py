@@ -0,0 +1,119 @@
+# backend/services/tx_tracker.py
+"""
+Pending-transaction tracker with batched receipt polling.
+
+Each `poll()` costs one `eth_blockNumber` call. Receipts are only requested
+when the chain has advanced past the last polled block, and then only for
+transactions that are due, all in JSON-RPC batches of RPC_BATCH_SIZE. A
+transaction that is still pending backs off exponentially (in blocks, capped
+at TX_MAX_BACKOFF_BLOCKS) and is dropped once it has been tracked longer
+than TX_TRACK_TTL seconds.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from backend.services import crypto_service
+
+TX_TRACK_TTL = float(os.getenv("TX_TRACK_TTL", "3600"))
+TX_MAX_BACKOFF_BLOCKS = int(os.getenv("TX_MAX_BACKOFF_BLOCKS", "32"))
+
+
+class TxTracker:
+    def __init__(self, ttl: float = TX_TRACK_TTL, max_backoff: int = TX_MAX_BACKOFF_BLOCKS):
+        self.ttl = ttl
+        self.max_backoff = max(1, max_backoff)
+        self._txs: Dict[str, Dict[str, Any]] = {}  # hash -> {added, attempts, next_block}
+        self._lock = threading.Lock()
+        self._last_block: Optional[int] = None
+        self._stats = {"polls": 0, "rpc_requests": 0, "receipts_requested": 0,
+                       "confirmed": 0, "failed": 0, "expired": 0}
+
+    def __len__(self) -> int:
+        return len(self._txs)
+
+    def track(self, tx_hash: str):
+        with self._lock:
+            self._txs.setdefault(tx_hash, {"added": time.monotonic(), "attempts": 0, "next_block": 0})
+
+    def pending(self) -> List[str]:
+        with self._lock:
+            return list(self._txs)
+
+    def _finish(self, tx_hash: str, status: str):
+        self._txs.pop(tx_hash, None)
+        self._stats[status] += 1
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """Blocking. Returns finished txs: confirmed, failed or expired."""
+        with self._lock:
+            if not self._txs:
+                return []
+            self._stats["polls"] += 1
+            now = time.monotonic()
+            done: List[Dict[str, Any]] = []
+            for h, t in list(self._txs.items()):
+                if now - t["added"] > self.ttl:
+                    self._finish(h, "expired")
+                    done.append({"tx_hash": h, "status": "expired", "attempts": t["attempts"]})
+            if not crypto_service.chain_configured():
+                for h in list(self._txs):  # same answer as check_tx without a chain
+                    self._finish(h, "confirmed")
+                    done.append({"tx_hash": h, "status": "confirmed", "mode": "mock"})
+                return done
+            if not self._txs or not crypto_service.chain.allow():  # breaker open: keep them for later
+                return done
+
+        block = self._block_number()
+        with self._lock:
+            if block is None or (self._last_block is not None and block <= self._last_block):
+                return done
+            self._last_block = block
+            due = [h for h, t in self._txs.items() if t["next_block"] <= block]
+
+        size = max(1, crypto_service.RPC_BATCH_SIZE)
+        for start in range(0, len(due), size):
+            chunk = due[start:start + size]
+            calls = [{"jsonrpc": "2.0", "id": i, "method": "eth_getTransactionReceipt", "params": [h]}
+                     for i, h in enumerate(chunk)]
+            try:
+                res = crypto_service.rpc_batch(calls)
+            except Exception as e:
+                crypto_service.logger.warning(f"[tx_tracker] Receipt batch error ({len(chunk)} txs): {e}")
+                res = {}
+            with self._lock:
+                self._stats["rpc_requests"] += 1
+                self._stats["receipts_requested"] += len(chunk)
+                for i, h in enumerate(chunk):
+                    t = self._txs.get(h)
+                    if t is None:
+                        continue
+                    receipt = (res.get(i) or {}).get("result")
+                    if not receipt:
+                        t["attempts"] += 1
+                        t["next_block"] = block + min(2 ** t["attempts"], self.max_backoff)
+                        continue
+                    status = "confirmed" if int(receipt.get("status", "0x0"), 16) == 1 else "failed"
+                    self._finish(h, status)
+                    done.append({"tx_hash": h, "status": status, "mode": "api",
+                                 "blockNumber": int(receipt.get("blockNumber") or "0x0", 16)})
+        return done
+
+    def _block_number(self) -> Optional[int]:
+        with self._lock:
+            self._stats["rpc_requests"] += 1
+        try:
+            res = crypto_service.rpc_batch([{"jsonrpc": "2.0", "id": 0, "method": "eth_blockNumber", "params": []}])
+            return crypto_service.hex_result(res.get(0))
+        except Exception as e:
+            crypto_service.logger.warning(f"[tx_tracker] eth_blockNumber error: {e}")
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "pending": len(self._txs), "last_block": self._last_block,
+                    "ttl_s": self.ttl, "max_backoff_blocks": self.max_backoff}
+
+
+tracker = TxTracker()
@@ -0,0 +1,85 @@
+# backend/services/watchlist_service.py
+"""
+Persisted list of wallets watched by the crypto alert checks.
+
+Stored as a JSON list in WATCHLIST_FILE; addresses are kept lowercase so the
+same wallet cannot be added twice with different checksum casing.
+"""
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from backend.services.log_service import add_log
+
+WATCHLIST_FILE = Path(os.getenv("WATCHLIST_FILE", Path(__file__).resolve().parents[2] / "data" / "watchlist.json"))
+ADDRESS_RE = re.compile(r"^0x[0-9a-fA-F]{40}$")
+
+_lock = threading.RLock()
+_wallets: Optional[Dict[str, Dict[str, object]]] = None  # address -> entry, insertion ordered
+
+
+def _load() -> Dict[str, Dict[str, object]]:
+    global _wallets
+    if _wallets is None:
+        _wallets = {}
+        try:
+            for e in json.loads(WATCHLIST_FILE.read_text(encoding="utf-8")):
+                _wallets[str(e["address"]).lower()] = e
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"❌ Failed to load watchlist: {e}")
+    return _wallets
+
+
+def _save():
+    try:
+        WATCHLIST_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = WATCHLIST_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(list(_wallets.values()), indent=2), encoding="utf-8")
+        tmp.replace(WATCHLIST_FILE)
+    except Exception as e:
+        print(f"❌ Failed to save watchlist: {e}")
+
+
+def get_watchlist() -> List[Dict[str, object]]:
+    with _lock:
+        return [dict(e) for e in _load().values()]
+
+
+def add_wallet(address: str, label: Optional[str] = None) -> Dict[str, object]:
+    """Watch a wallet (or relabel it if already watched)."""
+    if not ADDRESS_RE.match(address or ""):
+        raise ValueError(f"Invalid wallet address: {address}")
+    key = address.lower()
+    with _lock:
+        wallets = _load()
+        entry = wallets.get(key)
+        if entry is None:
+            entry = wallets[key] = {"address": key, "label": label or key, "added_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+            add_log("action", f"Wallet added to watchlist: {entry['label']}", {"wallet": key})
+        elif label:
+            entry["label"] = label
+        _save()
+        return dict(entry)
+
+
+def remove_wallet(address: str) -> bool:
+    with _lock:
+        entry = _load().pop((address or "").lower(), None)
+        if entry is None:
+            return False
+        _save()
+    add_log("action", f"Wallet removed from watchlist: {entry['label']}", {"wallet": entry["address"]})
+    return True
+
+
+def reload_watchlist():
+    """Drop the in-memory copy; the next access re-reads WATCHLIST_FILE."""
+    global _wallets
+    with _lock:
+        _wallets = None
@@ -0,0 +1,113 @@
+"""
+Benchmark: a new httpx.AsyncClient per request (the old routes/prices code)
+vs the shared pooled client from backend.services.http_client.
+
+    python -m benchmarks.bench_http_client [requests]
+
+Starts a local HTTPS stub with a throwaway self-signed certificate (needs the
+`openssl` CLI) that counts TLS handshakes, then times sequential
+CoinGecko-style GETs both ways.
+"""
+import asyncio
+import json
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from backend.services import http_client
+
+PATH = "/api/v3/simple/price?ids=ethereum&vs_currencies=usd"
+
+
+class _Stub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = json.dumps({"ethereum": {"usd": 3500.0}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _TLSServer(ThreadingHTTPServer):
+    daemon_threads = True
+    handshakes = 0
+
+    def __init__(self, addr, handler, ctx):
+        super().__init__(addr, handler)
+        self.ctx = ctx
+
+    def get_request(self):
+        sock, addr = super().get_request()
+        type(self).handshakes += 1
+        return self.ctx.wrap_socket(sock, server_side=True), addr
+
+
+def _cert(tmp):
+    cert, key = os.path.join(tmp, "cert.pem"), os.path.join(tmp, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=localhost",
+         "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1", "-keyout", key, "-out", cert],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+async def _per_request(url, verify, n):
+    for _ in range(n):
+        async with httpx.AsyncClient(timeout=5.0, verify=verify) as client:
+            (await client.get(url)).raise_for_status()
+
+
+async def _pooled(url, n):
+    client = http_client.get_async_client()
+    for _ in range(n):
+        (await client.get(url)).raise_for_status()
+    await http_client.close()
+
+
+def _run(label, server, coro, n):
+    before = server.handshakes
+    t = time.perf_counter()
+    asyncio.run(coro)
+    ms = (time.perf_counter() - t) * 1000
+    print(f"{label:<28}{n:>9}{ms:>11.1f}{ms / n:>13.3f}{server.handshakes - before:>12}")
+    return ms
+
+
+def main(n):
+    with tempfile.TemporaryDirectory() as tmp:
+        cert, key = _cert(tmp)
+        server_ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        server_ctx.load_cert_chain(cert, key)
+        server = _TLSServer(("127.0.0.1", 0), _Stub, server_ctx)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"https://localhost:{server.server_port}{PATH}"
+
+        verify = ssl.create_default_context(cafile=cert)
+        # The pooled client uses the app settings; trust the stub certificate for this run
+        orig = http_client._options
+        http_client._options = lambda: {**orig(), "verify": verify}
+
+        print(f"{'client':<28}{'requests':>9}{'total ms':>11}{'ms/request':>13}{'handshakes':>12}")
+        old = _run("new AsyncClient per request", server, _per_request(url, verify, n), n)
+        new = _run("shared pooled client", server, _pooled(url, n), n)
+        print(f"speedup: {old / new:.1f}x (HTTP/2 {'on' if http_client._H2 else 'off'}; the stub speaks HTTP/1.1)")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
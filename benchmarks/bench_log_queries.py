@@ -0,0 +1,76 @@
+"""
+Micro-benchmark: indexed log_service.get_logs vs the previous full-scan version.
+
+    python -m benchmarks.bench_log_queries [sizes...]
+
+For each window size it fills the in-memory index directly (no journal I/O)
+and times the AuditLog-style queries: latest 50, latest 50 of one type, and
+latest 50 since a recent timestamp.
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+os.environ.setdefault("AUDIT_LOG_FILE", os.path.join(tempfile.mkdtemp(), "audit_logs.json"))
+
+from backend.services import log_service  # noqa: E402
+
+TYPES = ["info", "success", "warning", "error", "action"]
+FMT = "%Y-%m-%d %H:%M:%S"
+
+
+def _scan_get_logs(entries, limit=50, types=None, since=None):
+    """The pre-index implementation, kept here as the baseline."""
+    logs = list(entries)
+    if types:
+        want = set(types)
+        logs = [e for e in logs if e.get("type") in want]
+    if since:
+        logs = [e for e in logs if datetime.strptime(e["timestamp"], FMT) > since]
+    return logs[-limit:]
+
+
+def _fill(n):
+    log_service.LOG_MAX_ENTRIES = n
+    log_service._reset_index()
+    t0 = 1_700_000_000
+    entries = []
+    for i in range(n):
+        ts = t0 + i // 4
+        e = {"id": i + 1, "type": TYPES[i % 7 % 5], "message": f"entry {i}",
+             "timestamp": datetime.fromtimestamp(ts).strftime(FMT), "ts": ts}
+        log_service._index(e)
+        entries.append(e)
+    return entries, datetime.fromtimestamp(t0 + (n - 200) // 4)
+
+
+def _time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000
+
+
+def main(sizes):
+    print(f"{'entries':>9}  {'query':<22}{'scan ms':>12}{'indexed ms':>12}{'speedup':>10}")
+    for n in sizes:
+        entries, since = _fill(n)
+        repeat = 3 if n >= 1_000_000 else 10
+        queries = {
+            "limit=50": dict(limit=50),
+            "limit=50 type=error": dict(limit=50, types=["error"]),
+            "limit=50 since": dict(limit=50, since=since),
+        }
+        for name, kw in queries.items():
+            assert _scan_get_logs(entries, **kw) == log_service.get_logs(**kw)
+            scan = _time(lambda: _scan_get_logs(entries, **kw), repeat)
+            idx = _time(lambda: log_service.get_logs(**kw), repeat * 100)
+            print(f"{n:>9}  {name:<22}{scan:>12.3f}{idx:>12.4f}{scan / idx:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1_000, 100_000, 1_000_000])
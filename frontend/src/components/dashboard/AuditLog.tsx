@@ -4,7 +4,7 @@ import React, { useEffect, useMemo, useRef, useState } from "react";
 import { motion, AnimatePresence } from "framer-motion";
 import { Search, ChevronDown, ChevronUp } from "lucide-react";
 import { getEventIcon } from "@/lib/eventIcons";
-import { getLogs } from "@/lib/api";
+import { getLogs, streamLogs } from "@/lib/api";
 import Panel from "@/components/Panel";
 
 export interface LogEntry {
@@ -108,8 +108,16 @@ export default function AuditLog({ events: externalEvents }: AuditLogProps) {
     };
 
     fetchLogs();
-    const interval = setInterval(fetchLogs, 15000);
-    return () => clearInterval(interval);
+    if (typeof EventSource === "undefined") {
+      const interval = setInterval(fetchLogs, 15000);
+      return () => clearInterval(interval);
+    }
+    // Push new entries instead of re-polling the whole log
+    return streamLogs(
+      (log) => setEvents((prev) => [...prev.filter((e) => e.id !== log.id), log].slice(-1000)),
+      ({ log_id, ...patch }) =>
+        setEvents((prev) => prev.map((e) => (e.id === log_id ? { ...e, ...patch } : e)))
+    );
   }, [externalEvents]);
 
   // --- Filter + search ---
@@ -237,6 +237,22 @@ export async function getLogs(): Promise<LogEntry[]> {
   return apiFetch<LogEntry[]>("/logs");
 }
 
+/** Changed fields of an earlier entry (a coalesced repeat), keyed by log_id. */
+export type LogPatch = { log_id: number } & Record<string, any>;
+
+/** Live tail of new log entries (SSE); the browser resumes via Last-Event-ID. */
+export function streamLogs(
+  onLog: (log: LogEntry) => void,
+  onPatch?: (patch: LogPatch) => void
+): () => void {
+  const es = new EventSource(`${API_BASE}/logs/stream`);
+  es.addEventListener("log", (ev) => onLog(JSON.parse((ev as MessageEvent).data)));
+  if (onPatch) {
+    es.addEventListener("log_patch", (ev) => onPatch(JSON.parse((ev as MessageEvent).data)));
+  }
+  return () => es.close();
+}
+
 export async function pushLog(
   type: "info" | "success" | "error" | "action" | "alert",
   message: string,
@@ -0,0 +1,115 @@
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Tuple
+
+import pytest
+
+# Keep service state (audit journal, etc.) out of the repo while testing
+_TMP = tempfile.mkdtemp(prefix="finance-agent-tests-")
+os.environ.setdefault("AUDIT_LOG_FILE", os.path.join(_TMP, "audit_logs.json"))
+os.environ.setdefault("ALERT_ID_FILE", os.path.join(_TMP, "alert_ids.json"))
+os.environ.setdefault("WATCHLIST_FILE", os.path.join(_TMP, "watchlist.json"))
+
+
+def _word(n: int) -> str:
+    """One 32-byte ABI word as 0x-hex."""
+    return "0x" + n.to_bytes(32, "big").hex()
+
+
+def _abi_string(s: str) -> str:
+    raw = s.encode()
+    return _word(32) + _word(len(raw))[2:] + raw.hex().ljust(64 * max(1, -(-len(raw) // 32)), "0")
+
+
+class RpcNode:
+    """
+    JSON-RPC stub node. Tests register only the answers they need: `on(method, fn(params))`
+    for any method, `on_call(to, selector, fn(data))` for eth_call, or `erc20(...)` for a
+    token. A handler that raises answers with a JSON-RPC error; unregistered methods
+    answer -32601. `requests` holds the method names of each HTTP request, `calls` every call.
+    """
+
+    def __init__(self):
+        self.methods: Dict[str, Callable[[list], Any]] = {}
+        self.contracts: Dict[Tuple[str, str], Callable[[str], Any]] = {}
+        self.requests: List[List[str]] = []
+        self.calls: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def on(self, method: str, fn: Callable[[list], Any]) -> "RpcNode":
+        self.methods[method] = fn
+        return self
+
+    def on_call(self, to: str, selector: str, fn: Callable[[str], Any]) -> "RpcNode":
+        self.contracts[(to.lower(), selector)] = fn
+        return self
+
+    def erc20(self, token: str, symbol: str, decimals: int, balance_of: Callable[[int], int]) -> "RpcNode":
+        """decimals(), symbol() and balanceOf(owner) -> balance_of(int(owner)) for `token`."""
+        self.on_call(token, "0x313ce567", lambda data: _word(decimals))
+        self.on_call(token, "0x95d89b41", lambda data: _abi_string(symbol))
+        return self.on_call(token, "0x70a08231", lambda data: _word(balance_of(int(data[10:], 16))))
+
+    def selectors(self) -> List[str]:
+        return [c["params"][0]["data"][:10] for c in self.calls if c["method"] == "eth_call"]
+
+    def _answer(self, c: Dict[str, Any]) -> Dict[str, Any]:
+        params = c.get("params", [])
+        fn = self.methods.get(c["method"])
+        if c["method"] == "eth_call":
+            contract = self.contracts.get((params[0]["to"].lower(), params[0]["data"][:10]))
+            fn = (lambda p: contract(p[0]["data"])) if contract else fn
+        if fn is None:
+            return {"jsonrpc": "2.0", "id": c["id"], "error": {"code": -32601, "message": "unsupported"}}
+        try:
+            return {"jsonrpc": "2.0", "id": c["id"], "result": fn(params)}
+        except Exception as e:
+            return {"jsonrpc": "2.0", "id": c["id"], "error": {"code": -32000, "message": str(e)}}
+
+    def answer(self, req: Any) -> Any:
+        calls = req if isinstance(req, list) else [req]
+        with self._lock:
+            self.requests.append([c["method"] for c in calls])
+            self.calls.extend(calls)
+        out = [self._answer(c) for c in calls]
+        return out if isinstance(req, list) else out[0]
+
+
+def _rpc_handler(node: RpcNode):
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            body = json.dumps(node.answer(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return _Handler
+
+
+@pytest.fixture
+def rpc_node(monkeypatch):
+    """A live RpcNode as crypto_service's RPC_URL, with the chain breaker and token registry reset."""
+    from backend.services import crypto_service
+    from backend.services.token_registry import tokens
+
+    node = RpcNode()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _rpc_handler(node))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(crypto_service, "RPC_URL", f"http://127.0.0.1:{server.server_port}")
+    crypto_service.chain.reset()
+    tokens.clear()
+    yield node
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,74 @@
+import json
+import time
+from datetime import datetime, timedelta
+
+from backend.services import alert_rules, alert_service
+from backend.services.alert_rules import MetricsSnapshot, Rule, evaluate, render
+
+
+def _messages(snap, rules=None):
+    return [render(r, s, v, snap)[0] for r, s, v in evaluate(rules or alert_rules.DEFAULT_RULES, snap)]
+
+
+def test_default_rules_reproduce_original_checks():
+    snap = MetricsSnapshot()
+    snap.set("symbol", "BTC", price=111145.0)
+    snap.set("symbol", "ETH", price=99999.0)  # only BTC is covered by the 70K rule
+    snap.set("wallet", "0xdemo", {"label": "Demo wallet"}, eth=0.001, usdc=8)
+    snap.set("wallet", "0xrich", eth=5, usdc=1000)
+    renew = datetime.now() + timedelta(days=1)
+    snap.set("user", "user1", canceled=True, paused=False)
+    snap.set("user", "user2", {"renews_on": renew.isoformat(), "renews_date": str(renew.date())},
+             canceled=False, paused=True, renews_in_days=1.0)
+    snap.set("user", "user3", canceled=False, paused=False)  # no renewal date -> NaN, never matches
+
+    assert _messages(snap) == [
+        "BTC crossed $70K! Current: 111145.00",
+        "Demo wallet ETH critically low",
+        "Demo wallet USDC low",
+        "user1 subscription cancelled",
+        "user2 subscription paused",
+        f"user2 subscription expiring soon ({renew.date()})",
+    ]
+    hit = [h for h in evaluate(alert_rules.DEFAULT_RULES, snap) if h[0].id == "subscription_expiring"][0]
+    assert render(*hit, snap)[1] == {"user": "user2", "renews_on": renew.isoformat()}
+
+
+def test_rules_load_from_config_and_fire_through_add_alert(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps([{"id": "whale", "scope": "wallet", "metric": "eth", "op": ">=",
+                                 "threshold": 100, "level": "info", "message": "{label} holds {value:g} ETH"}]))
+    rules = alert_rules.load_rules(str(path))
+    assert [r.id for r in rules] == ["whale"]
+
+    alert_service.clear_alerts()
+    snap = MetricsSnapshot()
+    snap.set("wallet", "0xa", eth=150)
+    snap.set("wallet", "0xb", eth=1)
+    assert alert_service.apply_rules(snap, rules) == 1
+    assert alert_service.get_alerts()[-1]["message"] == "0xa holds 150 ETH"
+
+
+def test_evaluate_is_vectorized_across_many_subjects():
+    snap = MetricsSnapshot()
+    for i in range(10_000):
+        snap.set("wallet", f"0x{i:040x}", eth=i / 1000, usdc=i % 50)
+    rules = [Rule(f"r{k}", "wallet", "usdc" if k % 2 else "eth", "<", k + 0.5) for k in range(20)]
+    t = time.perf_counter()
+    hits = evaluate(rules, snap)
+    assert time.perf_counter() - t < 1.0
+    expected = sum(1 for k in range(20) for i in range(10_000)
+                   if ((i % 50) if k % 2 else i / 1000) < k + 0.5)
+    assert len(hits) == expected
+
+
+def test_labelled_wallets_alert_separately():
+    alert_service.clear_alerts()
+    snap = MetricsSnapshot()
+    snap.set("wallet", "0xc1", {"label": "Cold 1"}, eth=1, usdc=8)
+    snap.set("wallet", "0xc2", {"label": "Cold 2"}, eth=1, usdc=8)
+    for _ in range(2):  # the second tick only bumps each wallet's own alert
+        alert_service.apply_rules(snap)
+    alerts = alert_service.get_alerts()
+    assert sorted((a["message"], a["context"]["wallet"], a["count"]) for a in alerts) == [
+        ("Cold 1 USDC low", "0xc1", 2), ("Cold 2 USDC low", "0xc2", 2)]
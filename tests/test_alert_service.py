@@ -0,0 +1,115 @@
+from backend.services import alert_service
+from backend.services.alert_service import AlertLevel, AlertType
+
+
+def test_repeated_alert_bumps_existing_within_cooldown():
+    alert_service.clear_alerts()
+    first = alert_service.add_alert("BTC crossed $70K! Current: 111145.00", AlertLevel.INFO, atype=AlertType.CRYPTO)
+    again = alert_service.add_alert("BTC crossed $70K! Current: 111200.00", AlertLevel.INFO, atype=AlertType.CRYPTO)
+    assert again is first
+    assert first["count"] == 2 and first["last_message"].endswith("111200.00")
+    assert len(alert_service.get_alerts()) == 1
+
+    # different context keys -> different fingerprint
+    alert_service.add_alert("Demo wallet USDC low", ctx={"wallet": "0xabc"})
+    alert_service.add_alert("Demo wallet USDC low", ctx={"wallet": "0xabc", "usdc": 8})
+    assert len(alert_service.get_alerts()) == 3
+
+
+def test_alert_refires_after_cooldown_or_resolve():
+    alert_service.clear_alerts()
+    a = alert_service.add_alert("Demo wallet ETH critically low", cooldown=0)
+    a["last_seen_ts"] -= 1
+    b = alert_service.add_alert("Demo wallet ETH critically low", cooldown=0)
+    assert b is not a and b["count"] == 1
+
+    assert alert_service.resolve_alert(b["id"])
+    c = alert_service.add_alert("Demo wallet ETH critically low")
+    assert c is not b and c["count"] == 1
+
+
+def test_alert_ids_monotonic_and_lookup_is_constant_time(monkeypatch):
+    alert_service.clear_alerts()
+    monkeypatch.setattr(alert_service, "ALERT_MAX_ENTRIES", 100_000)
+    ids = [alert_service.add_alert(f"bulk {i}", ctx={"k%d" % i: i})["id"] for i in range(100_000)]
+    assert ids == sorted(set(ids))
+    assert alert_service.get_alert(ids[50_000])["message"] == "bulk 50000"
+
+    assert alert_service.acknowledge_alert(ids[10])["acknowledged"] is True
+    assert alert_service.resolve_alert(ids[20]) and alert_service.get_alert(ids[20]) is None
+    assert not alert_service.resolve_alert(ids[20])
+
+    # eviction keeps the newest ALERT_MAX_ENTRIES; ids never restart
+    monkeypatch.setattr(alert_service, "ALERT_MAX_ENTRIES", 10)
+    last = alert_service.add_alert("after shrink")
+    assert last["id"] > ids[-1] and len(alert_service.get_alerts(limit=100)) == 10
+    alert_service.clear_alerts()
+    assert alert_service.add_alert("after clear")["id"] > last["id"]
+
+
+def test_alert_id_block_survives_restart(monkeypatch, tmp_path):
+    monkeypatch.setattr(alert_service, "ALERT_ID_FILE", tmp_path / "ids.json")
+    monkeypatch.setattr(alert_service, "_next_id", 1)
+    monkeypatch.setattr(alert_service, "_reserved", 1)
+    for _ in range(3):
+        alert_service._new_id()
+    # a fresh process resumes from the persisted ceiling, past every id handed out
+    assert alert_service._load_id_ceiling() == 1 + alert_service._ID_BLOCK
+
+
+def test_get_alerts_level_type_indexes_match_scan():
+    alert_service.clear_alerts()
+    levels = [AlertLevel.INFO, AlertLevel.WARNING, AlertLevel.ERROR]
+    types = [AlertType.CRYPTO, AlertType.SUBSCRIPTION]
+    made = [alert_service.add_alert(f"a{i}", levels[i % 3], ctx={"n%d" % i: i}, atype=types[i % 2]) for i in range(60)]
+    for a in made[::7]:
+        alert_service.resolve_alert(a["id"])
+    live = alert_service.get_alerts(limit=1000)
+
+    def scan(limit=20, level=None, atype=None, after_id=None):
+        rows = [a for a in live if (not level or a["level"] == level) and (not atype or a["type"] == atype)]
+        if after_id is not None:
+            return [a for a in rows if a["id"] > after_id][:limit]
+        return rows[-limit:]
+
+    for kw in ({}, {"level": "error"}, {"atype": "crypto"}, {"level": "warning", "atype": "subscription"},
+               {"level": "info", "after_id": made[30]["id"], "limit": 3}, {"level": "nope"}):
+        assert alert_service.get_alerts(**kw) == scan(**kw)
+
+
+def test_run_checks_is_concurrent_with_per_check_deadlines():
+    import time
+
+    def slow(delay, n):
+        def run():
+            time.sleep(delay)
+            return n
+        return run
+
+    def boom():
+        raise RuntimeError("upstream down")
+
+    checks = {f"user{i}": slow(0.2, 1) for i in range(8)}
+    checks["hung"] = slow(2.0, 5)
+    checks["broken"] = boom
+    t = time.perf_counter()
+    report = alert_service.run_checks(checks, timeout=0.5, budget=5)
+    wall = time.perf_counter() - t
+
+    assert wall < 1.0  # slowest check's deadline, not the sum (8 * 0.2 + 2.0)
+    assert report["alerts"] == 8 and report["completed"] == 8
+    assert report["timed_out"] == ["hung"] and report["errors"] == {"broken": "upstream down"}
+    assert alert_service.get_check_stats()["timed_out"] == ["hung"]
+
+
+def test_check_alerts_collects_then_applies_rules(monkeypatch):
+    alert_service.clear_alerts()
+    monkeypatch.setattr(alert_service.crypto_service, "get_price", lambda s: {"price": 80_000})
+    monkeypatch.setattr(alert_service.crypto_service, "get_balances", lambda ws: {w: {"eth": 1, "usdc": 2} for w in ws})
+    statuses = {"user1": {"status": "canceled"}, "user2": {"status": "active"}}
+    monkeypatch.setattr(alert_service, "get_subscription_status", lambda u: statuses.get(u) or 1 / 0)
+
+    assert alert_service.check_alerts(("user1", "user2", "user3")) == 4
+    messages = [a["message"] for a in alert_service.get_alerts()]
+    assert messages[-3:] == ["BTC crossed $70K! Current: 80000.00", "Demo wallet USDC low", "user1 subscription cancelled"]
+    assert any(m.startswith("Error checking subscription for user3") for m in messages)
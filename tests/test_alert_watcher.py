@@ -0,0 +1,91 @@
+from collections import deque
+
+from backend.services import alert_watcher
+
+
+def test_recent_alert_dedup_tracks_evictions(monkeypatch):
+    monkeypatch.setattr(alert_watcher, "_recent_alerts", deque(maxlen=3))
+    monkeypatch.setattr(alert_watcher, "_recent_keys", set())
+    with alert_watcher._lock:
+        assert [alert_watcher._remember({"id": i, "message": f"m{i}"}) for i in (1, 2, 2, 3, 4)] == [
+            True, True, False, True, True]
+        assert alert_watcher._recent_keys == {2, 3, 4}
+        assert alert_watcher._remember({"id": 1, "message": "m1"})  # evicted, so it may come back
+    assert [a["id"] for a in alert_watcher.get_recent_alerts(limit=2)] == [4, 1]
+    assert len(alert_watcher._recent_keys) == len(alert_watcher._recent_alerts) == 3
+
+
+def test_tx_alerts_dedup_on_hash_and_status(monkeypatch):
+    monkeypatch.setattr(alert_watcher, "_recent_alerts", deque(maxlen=10))
+    monkeypatch.setattr(alert_watcher, "_recent_keys", set())
+    same_ms = 1_700_000_000_000  # ids minted in the same millisecond must not collide
+    with alert_watcher._lock:
+        assert [alert_watcher._remember({"id": same_ms, "tx_hash": h, "status": s})
+                for h, s in (("0xa", "confirmed"), ("0xb", "confirmed"), ("0xa", "confirmed"), ("0xa", "failed"))
+                ] == [True, True, False, True]
+
+
+def test_every_tx_confirmed_in_one_poll_surfaces(monkeypatch):
+    import asyncio
+
+    class _Tracker:
+        ttl = 3600.0
+
+        def __len__(self):
+            return 5
+
+        def poll(self):
+            return [{"tx_hash": f"0x{i:064x}", "status": "confirmed", "blockNumber": 42} for i in range(5)]
+
+    monkeypatch.setattr(alert_watcher, "_recent_alerts", deque(maxlen=10))
+    monkeypatch.setattr(alert_watcher, "_recent_keys", set())
+    monkeypatch.setattr(alert_watcher, "tx_tracker", _Tracker())
+    monkeypatch.setattr(alert_watcher.alert_service, "check_alerts", lambda: 0)
+
+    async def one_tick():
+        task = asyncio.get_running_loop().create_task(alert_watcher._watch_loop(interval=60))
+        while len(alert_watcher._recent_alerts) < 5 and not task.done():
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(asyncio.wait_for(one_tick(), 5))
+    alerts = alert_watcher.get_recent_alerts(limit=10)
+    assert [a["tx_hash"] for a in alerts] == [f"0x{i:064x}" for i in range(5)]
+    assert len({a["id"] for a in alerts}) == 5
+
+
+def test_watch_loop_keeps_event_loop_responsive(monkeypatch):
+    import asyncio
+    import threading
+    import time
+
+    in_flight = threading.Event()
+
+    def slow_check():
+        in_flight.set()
+        time.sleep(0.5)  # blocking upstream call
+        return 0
+
+    monkeypatch.setattr(alert_watcher.alert_service, "check_alerts", slow_check)
+
+    async def probe():
+        alert_watcher.start_watcher(loop_interval=60)
+        lags = []
+        loop = asyncio.get_running_loop()
+        while not in_flight.is_set():
+            await asyncio.sleep(0.001)
+        deadline = loop.time() + 0.4
+        while loop.time() < deadline:
+            t = loop.time()
+            await asyncio.sleep(0.005)
+            lags.append(loop.time() - t - 0.005)
+        alert_watcher.stop_watcher()
+        return lags
+
+    lags = asyncio.run(probe())
+    assert in_flight.is_set() and len(lags) > 20
+    lags.sort()
+    assert lags[int(len(lags) * 0.95)] < 0.005  # p95 loop latency of a few ms while the check runs
+    assert lags[-1] < 0.05  # and never anywhere near the 500 ms a blocked loop would show
+    stats = alert_watcher.get_watcher_stats()
+    assert stats["running"] is False and stats["workers"] == alert_watcher.WATCHER_WORKERS
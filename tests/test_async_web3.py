@@ -0,0 +1,84 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from backend.routes import crypto as crypto_routes
+from backend.services import crypto_service
+
+MINED = "0x" + "ab" * 32
+
+
+def _receipt(params):
+    if params[0] != MINED:
+        return None
+    return {"transactionHash": MINED, "status": "0x1", "blockNumber": "0x2a", "blockHash": "0x" + "00" * 32,
+            "transactionIndex": "0x0", "from": "0x" + "11" * 20, "to": "0x" + "22" * 20,
+            "cumulativeGasUsed": "0x5208", "gasUsed": "0x5208", "logs": [], "logsBloom": "0x" + "00" * 256,
+            "contractAddress": None, "effectiveGasPrice": "0x1", "type": "0x2"}
+
+
+@pytest.fixture
+def node(rpc_node, monkeypatch):
+    """ETH balance = wallet index * 10**15 wei, USDC = index * 10**6; only MINED has a receipt."""
+    rpc_node.on("eth_chainId", lambda params: "0xaa36a7")
+    rpc_node.on("eth_getBalance", lambda params: hex(int(params[0][-4:], 16) * 10 ** 15))
+    rpc_node.on("eth_getTransactionReceipt", _receipt)
+    rpc_node.erc20(crypto_service.USDC_ADDR, "USDC", 6, lambda owner: (owner & 0xFFFF) * 10 ** 6)
+    monkeypatch.setattr(crypto_service, "_aw3", None)
+    monkeypatch.setattr(crypto_service, "_aw3_session", None)
+    return rpc_node
+
+
+def test_async_balances_and_tx_checks(node):
+    wallets = ["0x" + f"{i:040x}" for i in range(1, 301)]
+
+    async def run():
+        balances = await asyncio.gather(*(crypto_service.aget_balance(w) for w in wallets))
+        mined = await crypto_service.acheck_tx(MINED)
+        pending = await crypto_service.acheck_tx("0x" + "cd" * 32)
+        await crypto_service.aclose()
+        return balances, mined, pending
+
+    balances, mined, pending = asyncio.run(run())
+    assert [b["usdc"] for b in balances] == list(range(1, 301))
+    assert balances[6]["eth"] == 0.007 and "note" not in balances[6]
+    assert mined == {"tx_hash": MINED, "status": "confirmed", "blockNumber": 42, "mode": "api"}
+    assert pending["status"] == "pending"
+
+
+def test_balance_and_check_tx_endpoints_are_async(node):
+    assert asyncio.iscoroutinefunction(crypto_routes.balance)
+    assert asyncio.iscoroutinefunction(crypto_routes.check)
+    app = FastAPI()
+    app.include_router(crypto_routes.router, prefix="/api/crypto")
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            res = await asyncio.gather(*(client.get("/api/crypto/wallet/balance", params={"address": "0x" + f"{i:040x}"})
+                                         for i in range(1, 201)))
+            tx = await client.post("/api/crypto/check_tx", params={"tx_hash": MINED})
+        await crypto_service.aclose()
+        return res, tx
+
+    res, tx = asyncio.run(run())
+    assert [r.json()["usdc"] for r in res] == list(range(1, 201))
+    assert tx.json()["status"] == "confirmed"
+
+
+def test_each_event_loop_gets_its_own_provider(node):
+    wallet = "0x" + f"{5:040x}"
+
+    async def run(close):
+        aw3 = await crypto_service._get_aw3()
+        eth = (await crypto_service.aget_balance(wallet))["eth"]
+        if close:
+            await crypto_service.aclose()
+        return aw3, eth
+
+    (first, eth1), (second, eth2) = asyncio.run(run(False)), asyncio.run(run(True))
+    assert first is not second and eth1 == eth2 == 0.005
+    # web3 7.2.0 keeps this lock on the provider class; ours must not share it across loops
+    assert first.provider._request_cache_lock is not type(first.provider)._request_cache_lock
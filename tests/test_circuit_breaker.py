@@ -0,0 +1,59 @@
+import socket
+import time
+
+from backend.services import crypto_service
+from backend.services.circuit_breaker import BreakerState, CircuitBreaker
+
+
+def test_breaker_opens_half_opens_and_closes():
+    b = CircuitBreaker("rpc", failure_threshold=2, reset_timeout=0.1)
+    b.record_failure("timeout")
+    assert b.state is BreakerState.CLOSED and b.allow()
+    b.record_failure("timeout")
+    assert b.state is BreakerState.OPEN and not b.allow()
+
+    time.sleep(0.15)
+    assert b.state is BreakerState.HALF_OPEN and b.allow()
+    b.record_failure("still down")  # one failure while half-open re-opens it
+    assert b.state is BreakerState.OPEN
+
+    time.sleep(0.15)
+    b.record_success()
+    s = b.stats()
+    assert b.state is BreakerState.CLOSED
+    assert (s["opened"], s["rejected"], s["consecutive_failures"], s["last_error"]) == (2, 1, 0, "still down")
+
+
+def test_open_breaker_serves_fallbacks_without_rpc(monkeypatch):
+    # Nothing listens on this port; an open breaker must not even try it
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    monkeypatch.setattr(crypto_service, "RPC_URL", f"http://127.0.0.1:{sock.getsockname()[1]}")
+    sock.close()
+    monkeypatch.setattr(crypto_service, "chain", CircuitBreaker("rpc", failure_threshold=1, reset_timeout=60))
+
+    assert crypto_service._w3 is None  # importing the module built no client
+    assert crypto_service.probe_chain() is False
+    assert crypto_service.chain.state is BreakerState.OPEN and not crypto_service.is_chain_enabled()
+
+    addr = "0x" + "ab" * 20
+    assert crypto_service.get_balance(addr)["note"] == "[MOCK] chain circuit open"
+    assert crypto_service.get_balances([addr]) == {addr: {"address": addr, "error": "chain circuit open"}}
+    assert crypto_service.check_tx("0x" + "01" * 32)["error"] == "chain circuit open"
+    assert crypto_service._w3 is None
+
+
+def test_only_transport_and_rpc_errors_trip_the_breaker(monkeypatch):
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    monkeypatch.setattr(crypto_service, "RPC_URL", f"http://127.0.0.1:{sock.getsockname()[1]}")
+    sock.close()
+    monkeypatch.setattr(crypto_service, "chain", CircuitBreaker("rpc", failure_threshold=1, reset_timeout=60))
+
+    for _ in range(3):  # caller mistakes never reach the node
+        assert "invalid address" in crypto_service.get_balance("not-an-address")["note"]
+        assert crypto_service.check_tx("0xDEMOHASH")["error"] == "invalid tx hash"
+    assert crypto_service.chain.state is BreakerState.CLOSED
+
+    assert "fallback due to error" in crypto_service.get_balance("0x" + "ab" * 20)["note"]  # connection refused
+    assert crypto_service.chain.state is BreakerState.OPEN
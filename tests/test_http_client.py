@@ -0,0 +1,18 @@
+import asyncio
+
+from backend.services import http_client
+
+
+def test_async_client_is_shared_per_loop_and_closed_on_shutdown():
+    async def run():
+        await http_client.start()
+        a, b = http_client.get_async_client(), http_client.get_async_client()
+        assert a is b and http_client.stats()["async_open"]
+        await http_client.close()
+        assert a.is_closed and not http_client.stats()["sync_open"]
+        return http_client.get_async_client()  # lazily recreated after close
+
+    first = asyncio.run(run())
+    second = asyncio.run(run())
+    assert first is not second  # a new event loop gets its own client
+    assert http_client.get_client() is http_client.get_client()
@@ -0,0 +1,284 @@
+import asyncio
+import json
+import random
+from datetime import datetime
+
+from backend.services import log_service
+from backend.services.log_journal import JournalWriter, SegmentArchive, SegmentJournal
+
+
+def test_journal_rolls_and_compacts_segments(tmp_path):
+    j = SegmentJournal(tmp_path / "j", segment_entries=3, retain_entries=5)
+    for i in range(1, 10):
+        j.append([{"id": i, "type": "info", "message": f"m{i}"}])
+    # Oldest full segment dropped once the rest covers the retention window
+    assert sorted(p.name for p in (tmp_path / "j").iterdir()) == ["seg-000002.jsonl", "seg-000003.jsonl"]
+    assert [r["id"] for r in SegmentJournal(tmp_path / "j", 3, 5).replay()] == [5, 6, 7, 8, 9]
+
+
+def test_replay_skips_torn_line(tmp_path):
+    j = SegmentJournal(tmp_path, segment_entries=10, retain_entries=10)
+    j.append([{"id": 1}, {"id": 2}])
+    j.close()
+    with (tmp_path / "seg-000001.jsonl").open("a") as f:
+        f.write('{"id": 3, "mess')
+    assert [r["id"] for r in SegmentJournal(tmp_path, 10, 10).replay()] == [1, 2]
+
+
+def test_writer_group_commits_batches(tmp_path):
+    w = JournalWriter(SegmentJournal(tmp_path, 1000, 1000), interval=0.05, max_batch=50)
+    for i in range(200):
+        w.submit("append", {"id": i})
+    assert w.flush(timeout=5)
+    st = w.stats()
+    assert st["written"] == 200 and st["queue_depth"] == 0
+    assert st["batches"] <= 20
+    w.close()
+    assert len(SegmentJournal(tmp_path, 1000, 1000).replay()) == 200
+
+
+def test_load_logs_replays_journal():
+    log_service.clear_logs()
+    log_service.add_log("info", "first")
+    log_service.add_log("error", "second", {"user": "user1"})
+    log_service.load_logs()
+    logs = log_service.get_logs(limit=10)
+    assert [e["message"] for e in logs] == ["first", "second"]
+    assert logs[-1]["context"] == {"user": "user1"}
+    assert log_service.add_log("info", "third")["id"] == 3
+
+
+def test_migrates_legacy_json_file(tmp_path, monkeypatch):
+    legacy = tmp_path / "audit_logs.json"
+    legacy.write_text(json.dumps([{"id": 41, "type": "info", "message": "old", "timestamp": "2025-08-27 16:37:47"}]))
+    log_service.flush_logs()
+    monkeypatch.setattr(log_service, "LOG_FILE", legacy)
+    archive = SegmentArchive(tmp_path / "a")
+    archive.add([{"id": 7, "type": "info", "message": "archived", "ts": 1.0}])
+    monkeypatch.setattr(log_service._writer, "journal", SegmentJournal(tmp_path / "j", 10, 10, archive=archive))
+    log_service.load_logs()
+    assert log_service.get_logs()[-1]["id"] == 41
+    assert log_service.add_log("info", "new")["id"] == 42
+    assert len(archive.segments) == 1  # migrating didn't wipe the archive
+    assert not legacy.exists() and (tmp_path / "audit_logs.json.migrated").exists()
+
+    log_service.clear_logs()
+    log_service.load_logs()
+    assert log_service.get_logs() == []  # the legacy file is not migrated again
+
+
+def test_indexed_get_logs_matches_scan(monkeypatch):
+    monkeypatch.setattr(log_service, "LOG_MAX_ENTRIES", 300)
+    log_service._reset_index()
+    rnd = random.Random(7)
+    entries = []
+    for i in range(1, 3000):
+        e = {"id": i, "type": rnd.choice(["info", "error", "action"]), "message": f"m{i}", "ts": 1_700_000_000 + i // 3}
+        e["timestamp"] = datetime.fromtimestamp(e["ts"]).strftime("%Y-%m-%d %H:%M:%S")
+        log_service._index(e)
+        entries.append(e)
+    window = entries[-300:]
+    since = datetime.fromtimestamp(1_700_000_000 + 950)
+    for types, lim in ((None, 50), (["error"], 20), (["info", "action"], 500)):
+        want = [e for e in window if not types or e["type"] in types]
+        want = [e for e in want if datetime.strptime(e["timestamp"], "%Y-%m-%d %H:%M:%S") > since][-lim:]
+        assert log_service.get_logs(limit=lim, types=types, since=since) == want
+    assert log_service.get_logs(limit=5) == window[-5:]
+    log_service.load_logs()
+
+
+def test_sse_stream_resumes_after_last_event_id():
+    from backend.services.live_tail import sse_stream
+
+    class _Req:
+        async def is_disconnected(self):
+            return False
+
+    log_service.clear_logs()
+    first = log_service.add_log("info", "a")
+    log_service.add_log("error", "b")
+    log_service.add_log("info", "c")
+
+    async def run():
+        gen = sse_stream(
+            _Req(), log_service.log_stream,
+            backlog=lambda after: log_service.get_logs(limit=1, types=["info"], after_id=after),
+            matches=lambda e: e["type"] == "info",
+            last_id=first["id"], event="log",
+        )
+        frames = []
+        async for frame in gen:
+            if frame.startswith("id:"):
+                frames.append(json.loads(frame.split("data: ", 1)[1]))
+                if len(frames) == 1:
+                    await asyncio.to_thread(log_service.add_log, "error", "d")
+                    await asyncio.to_thread(log_service.add_log, "info", "e")
+            if len(frames) == 2:
+                break
+        await gen.aclose()
+        return [f["message"] for f in frames]
+
+    assert asyncio.run(run()) == ["c", "e"]
+    assert log_service.log_stream.subscriber_count == 0
+
+
+def test_keyset_pagination_and_ndjson_export():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from backend.routes import logs as logs_route
+
+    log_service.clear_logs()
+    for i in range(10):
+        log_service.add_log("error" if i % 2 else "info", f"m{i}")
+    older = log_service.get_logs(limit=3, before_id=8)
+    assert [e["id"] for e in older] == [5, 6, 7]
+    assert [e["id"] for e in log_service.get_logs(limit=2, types=["error"], after_id=4)] == [6, 8]
+    assert [e["id"] for e in log_service.iter_logs(types=["info"], batch=2)] == [1, 3, 5, 7, 9]
+
+    app = FastAPI()
+    app.include_router(logs_route.router, prefix="/api/logs")
+    client = TestClient(app)
+    page = client.get("/api/logs/", params={"limit": 4, "before_id": 9}).json()
+    assert [e["id"] for e in page["logs"]] == [5, 6, 7, 8]
+    assert page["next_before_id"] == 5
+    res = client.get("/api/logs/export", params={"after_id": 7})
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["id"] for line in res.text.splitlines()] == [8, 9, 10]
+
+
+def test_history_beyond_hot_window_served_from_archive(tmp_path, monkeypatch):
+    log_service.flush_logs()
+    archive = SegmentArchive(tmp_path / "archive")
+    monkeypatch.setattr(log_service, "LOG_MAX_ENTRIES", 10)
+    monkeypatch.setattr(log_service, "_archive", archive)
+    monkeypatch.setattr(log_service._writer, "journal", SegmentJournal(tmp_path / "j", 5, 10, archive=archive))
+    log_service.clear_logs()
+    for i in range(50):
+        log_service.add_log("error" if i % 5 == 0 else "info", f"m{i + 1}")
+    log_service.flush_logs()
+
+    assert len(archive.segments) == 10
+    assert archive.segments[0]["types"] == {"error": 1, "info": 4}
+    assert [e["id"] for e in log_service.get_logs(limit=5, before_id=20)] == [15, 16, 17, 18, 19]
+    assert [e["id"] for e in log_service.get_logs(limit=4, after_id=3)] == [4, 5, 6, 7]
+    assert [e["id"] for e in log_service.get_logs(limit=4, types=["error"])] == [31, 36, 41, 46]
+    assert [e["id"] for e in log_service.iter_logs(batch=7)] == list(range(1, 51))
+    assert log_service.get_log_stats()["archive"]["entries"] == 50
+    log_service.clear_logs()
+    log_service.flush_logs()
+    assert archive.segments == []
+
+
+def test_search_logs_and_terms_filters_and_eviction(monkeypatch):
+    monkeypatch.setattr(log_service, "LOG_MAX_ENTRIES", 5)
+    log_service.clear_logs()
+    wallet = "0x9ba79e76F4d1B06fA48855DC34e3D6E7bb1BED2B"
+    log_service.add_log("warning", "Demo wallet USDC low", {"wallet": wallet})
+    log_service.add_log("action", "Paused subscription sub_123", {"user": "user1"})
+    log_service.add_log("error", "Agent error", {"session": "a1b2c3d4", "user": "user1"})
+    log_service.add_log("action", "Refund processed for subscription sub_123", {"user": "user2"})
+
+    assert [e["id"] for e in log_service.search_logs(wallet)] == [1]
+    assert [e["id"] for e in log_service.search_logs("sub_123 user1")] == [2]
+    assert [e["id"] for e in log_service.search_logs("user1", types=["error"])] == [3]
+    assert [e["id"] for e in log_service.search_logs("sub_123", limit=1)] == [4]
+    assert log_service.search_logs("nothing here") == []
+
+    for i in range(5):
+        log_service.add_log("info", f"tick{i}")
+    assert log_service.search_logs(wallet) == []
+    assert log_service.get_log_stats()["search"]["documents"] == 5
+
+
+def test_repeated_messages_coalesce_and_survive_replay():
+    log_service.clear_logs()
+    log_service.add_log("info", " Running periodic alert check")
+    log_service.add_log("info", "ALERT [CRYPTO]: BTC crossed $70K! Current: 111145.00")
+    for price in ("111200.00", "111310.50"):
+        log_service.add_log("info", " Running periodic alert check")
+        log_service.add_log("info", f"ALERT [CRYPTO]: BTC crossed $70K! Current: {price}")
+    log_service.add_log("info", "Fetched 2 subscriptions", {"user": "user1"})
+    log_service.add_log("info", "Fetched 2 subscriptions", {"user": "user2"})
+
+    logs = log_service.get_logs()
+    assert [e["id"] for e in logs] == [1, 2, 3, 4]
+    assert logs[0]["repeat"] == 3 and "last_timestamp" in logs[0]
+    assert logs[1]["repeat"] == 3
+    assert logs[1]["message"].endswith("111145.00") and logs[1]["last_message"].endswith("111310.50")
+    assert "repeat" not in logs[2]
+
+    assert [e["id"] for e in log_service.search_logs("111310")] == [2]  # re-indexed with the latest wording
+
+    log_service.load_logs()
+    replayed = log_service.get_logs()
+    assert [(e["id"], e.get("repeat")) for e in replayed] == [(1, 3), (2, 3), (3, None), (4, None)]
+
+
+def test_repeat_is_published_as_a_patch():
+    log_service.clear_logs()
+
+    async def run():
+        sub = log_service.log_stream.subscribe()
+        try:
+            first = log_service.add_log("warning", "RPC retry 1")
+            log_service.add_log("warning", "RPC retry 2")
+            await asyncio.sleep(0.01)
+            return first, [sub.queue.get_nowait() for _ in range(sub.queue.qsize())]
+        finally:
+            log_service.log_stream.unsubscribe(sub)
+
+    first, seen = asyncio.run(run())
+    assert seen[0] is first and len(seen) == 2
+    assert seen[1] == {"log_id": first["id"], "type": "warning", "repeat": 2, "last_message": "RPC retry 2",
+                       "last_timestamp": first["last_timestamp"], "last_ts": first["last_ts"]}
+
+
+def test_archive_applies_patches_for_already_archived_entries(tmp_path):
+    from backend.services.log_journal import SegmentArchive
+
+    archive = SegmentArchive(tmp_path)
+    archive.add([{"id": 1, "type": "info", "message": "tick", "ts": 1.0}, {"op": "patch", "id": 1, "repeat": 2}])
+    archive.add([{"id": 2, "type": "info", "message": "x", "ts": 2.0}, {"op": "patch", "id": 1, "repeat": 5}])
+    assert archive.read(archive.segments[0])[0]["repeat"] == 5
+    reopened = SegmentArchive(tmp_path)
+    assert reopened.read(reopened.segments[0])[0]["repeat"] == 5
+    assert len(reopened.read(reopened.segments[1])) == 1
+
+
+def test_sse_patches_are_unsequenced():
+    from backend.services.live_tail import Broadcaster, format_sse, sse_stream
+
+    class _Req:
+        async def is_disconnected(self):
+            return False
+
+    bc = Broadcaster()
+
+    async def run():
+        gen = sse_stream(_Req(), bc, backlog=lambda after: [], matches=lambda e: True, last_id=5, event="log")
+        assert await gen.__anext__() == "retry: 3000\n\n"
+        nxt = asyncio.ensure_future(gen.__anext__())
+        await asyncio.sleep(0.01)
+        bc.publish({"log_id": 3, "repeat": 2})   # patch of an entry the client already has
+        patch = await nxt
+        bc.publish({"id": 4, "message": "old"})   # sequenced and <= Last-Event-ID: skipped
+        bc.publish({"id": 6, "message": "new"})
+        live = await gen.__anext__()
+        await gen.aclose()
+        return patch, live
+
+    patch, live = asyncio.run(run())
+    assert patch == format_sse({"log_id": 3, "repeat": 2}, "log") and patch.startswith("event: log_patch\n")
+    assert live.startswith("id: 6\nevent: log\n")
+
+
+def test_search_update_replaces_tokens_in_id_order():
+    from backend.services.log_search import InvertedIndex
+
+    idx = InvertedIndex()
+    idx.add(1, {"message": "rpc retry"})
+    idx.add(2, {"message": "gas spike"})
+    idx.update(1, {"message": "rpc retry", "last_message": "gas retry 7"})
+    assert idx.search("gas") == [1, 2] and idx.search("gas", limit=1) == [2]
+    idx.update(1, {"message": "rpc retry", "last_message": "rpc retry 8"})
+    assert idx.search("gas") == [2] and len(idx) == 2
@@ -0,0 +1,172 @@
+import asyncio
+import time
+
+import httpx
+
+from backend.services import crypto_service, http_client
+from backend.services.price_cache import PriceCache
+
+
+def _age(cache, key, seconds):
+    price, fetched = cache._data[key]
+    cache._data[key] = (price, fetched - seconds)
+
+
+def _coingecko(monkeypatch, price):
+    """Answer simple/price on the shared sync client with price(id); returns the requested id lists."""
+    requested = []
+
+    def handler(request):
+        ids = request.url.params["ids"].split(",")
+        requested.append(sorted(ids))
+        return httpx.Response(200, json={i: {"usd": price(i)} for i in ids})
+
+    monkeypatch.setattr(http_client, "_sync_client", httpx.Client(transport=httpx.MockTransport(handler)))
+    return requested
+
+
+def test_ttl_stale_while_revalidate_and_eviction():
+    cache = PriceCache(ttl=10, stale=60, max_entries=2)
+    calls = []
+
+    def fetch(v):
+        def run():
+            calls.append(v)
+            return v
+        return run
+
+    assert cache.get("bitcoin", fetch(100.0)) == 100.0          # miss: fetched inline
+    assert cache.get("bitcoin", fetch(999.0)) == 100.0          # fresh hit
+    _age(cache, "bitcoin", 20)
+    assert cache.get("bitcoin", fetch(101.0)) == 100.0          # stale: served, refreshed in background
+    for _ in range(100):
+        if cache.peek("bitcoin")[0] == 101.0:
+            break
+        time.sleep(0.01)
+    assert cache.get("bitcoin", fetch(999.0)) == 101.0
+    _age(cache, "bitcoin", 1000)
+    assert cache.get("bitcoin", fetch(102.0)) == 102.0          # too old: a miss again
+
+    cache.get("ethereum", fetch(1.0))
+    cache.get("bitcoin", fetch(0.0))                            # touch -> ethereum is least recent
+    cache.get("solana", fetch(2.0))
+    assert cache.peek("ethereum") is None and len(cache) == 2
+
+    s = cache.stats()
+    assert (s["hits"], s["stale_hits"], s["misses"], s["refreshes"], s["evictions"]) == (3, 1, 4, 1, 1)
+    assert calls == [100.0, 101.0, 102.0, 1.0, 2.0]
+
+
+def test_async_get_refreshes_in_background():
+    cache = PriceCache(ttl=10, stale=60)
+    n = {"calls": 0}
+
+    async def fetch():
+        n["calls"] += 1
+        await asyncio.sleep(0.01)
+        return 50.0 + n["calls"]
+
+    async def run():
+        assert await cache.aget("ethereum", fetch) == 51.0
+        _age(cache, "ethereum", 30)
+        got = await asyncio.gather(*(cache.aget("ethereum", fetch) for _ in range(10)))
+        assert got == [51.0] * 10                               # stale values served without waiting
+        await asyncio.sleep(0.05)
+        return await cache.aget("ethereum", fetch)
+
+    assert asyncio.run(run()) == 52.0 and n["calls"] == 2       # one refresh for ten stale readers
+
+
+def test_crypto_service_get_price_reads_through_shared_cache(monkeypatch):
+    requested = _coingecko(monkeypatch, lambda i: 111145.0)
+    crypto_service.price_cache.clear()
+    for _ in range(50):
+        assert crypto_service.get_price("btc") == {"symbol": "BTC", "price": 111145.0, "currency": "USD"}
+    assert requested == [["bitcoin"]]
+
+
+def test_get_prices_fetches_all_missing_symbols_in_one_call(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from backend.routes import prices
+
+    class FakeCG:
+        requests = []
+
+        def get_coins_list(self):
+            FakeCG.requests.append("coins/list")
+            return [{"id": f"coin-{i}", "symbol": f"c{i}", "name": f"Coin {i}"} for i in range(60)] + [
+                {"id": "pepe", "symbol": "pepe", "name": "Pepe"},
+                {"id": "pepe-bridged-wormhole", "symbol": "pepe", "name": "Bridged Pepe"}]
+
+    monkeypatch.setattr(crypto_service, "_cg", FakeCG())
+    requested = _coingecko(monkeypatch, lambda i: float(len(i)))
+    monkeypatch.setattr(crypto_service, "_coin_ids", None)
+    crypto_service.price_cache.clear()
+
+    syms = [f"C{i}" for i in range(48)] + ["ETH", "pepe", "NOPE"]
+    res = crypto_service.get_prices(syms)
+    assert res["ETH"]["price"] == float(len("ethereum")) and res["PEPE"]["price"] == 4.0
+    assert res["NOPE"] is None and len([r for r in res.values() if r]) == 50
+    assert FakeCG.requests == ["coins/list"] and len(requested) == 1  # coin list once + one price call
+
+    app = FastAPI()
+    app.include_router(prices.router, prefix="/api/price")
+    body = TestClient(app).get("/api/price", params={"symbols": "eth,C1,C2,BTC"}).json()
+    assert sorted(body["prices"]) == ["BTC", "C1", "C2", "ETH"] and body["missing"] == []
+    assert requested[1:] == [["bitcoin"]]  # only the uncached symbol went upstream
+
+    async def fake_fetch(cid):
+        return {"solana": 150.0, "pepe": 4.0}.get(cid)
+    monkeypatch.setattr(prices, "_fetch_usd", fake_fetch)
+    client = TestClient(app)
+    assert client.get("/api/price/SOL").json()["price"] == 150.0
+    assert client.get("/api/price/c5").json()["price"] == 6.0  # C5 -> coin-5 via the coin list (cached above)
+
+
+def test_failed_coin_list_is_retried_after_backoff(monkeypatch):
+    class FakeCG:
+        down = True
+        lists = 0
+
+        def get_coins_list(self):
+            FakeCG.lists += 1
+            if FakeCG.down:
+                raise RuntimeError("429 Too Many Requests")
+            return [{"id": "pepe", "symbol": "pepe", "name": "Pepe"}]
+
+    monkeypatch.setattr(crypto_service, "_cg", FakeCG())
+    _coingecko(monkeypatch, lambda i: 0.00001)
+    monkeypatch.setattr(crypto_service, "_coin_ids", None)
+    monkeypatch.setattr(crypto_service, "_coin_ids_retry_at", 0.0)
+    monkeypatch.setattr(crypto_service, "COIN_LIST_RETRY", 60.0)
+    crypto_service.price_cache.clear()
+
+    assert crypto_service.get_prices(["PEPE"]) == {"PEPE": None}
+    assert crypto_service.get_prices(["PEPE"]) == {"PEPE": None} and FakeCG.lists == 1  # backing off
+    assert crypto_service.coin_id("BTC") == "bitcoin"  # pinned ids still resolve meanwhile
+
+    FakeCG.down = False
+    monkeypatch.setattr(crypto_service, "_coin_ids_retry_at", 0.0)  # backoff elapsed
+    assert crypto_service.get_prices(["PEPE"])["PEPE"]["price"] == 0.00001 and FakeCG.lists == 2
+
+
+def test_mock_mode_price_skips_coin_list(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from backend.routes import prices
+
+    class FakeCG:
+        lists = 0
+
+        def get_coins_list(self):
+            FakeCG.lists += 1
+            return []
+
+    monkeypatch.setattr(crypto_service, "_cg", FakeCG())
+    monkeypatch.setattr(crypto_service, "_coin_ids", None)
+    monkeypatch.setattr(prices, "MOCK_MODE", True)
+    app = FastAPI()
+    app.include_router(prices.router, prefix="/api/price")
+    assert TestClient(app).get("/api/price/pepe").json()["price"] == 100.0
+    assert FakeCG.lists == 0
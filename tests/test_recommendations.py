@@ -0,0 +1,63 @@
+from backend.services import alert_service, recommendations
+from backend.services.alert_watcher import _advisor_style_enrichment
+from backend.services.recommendations import Matcher
+
+
+def _legacy_advice(msg):
+    msg = msg.lower()
+    if "btc crossed" in msg or "eth price" in msg or "dropped" in msg:
+        return 0
+    elif "wallet" in msg and "low" in msg:
+        return 1
+    elif "subscription" in msg:
+        return 2
+    elif "transaction failed" in msg:
+        return 3
+    elif "circle" in msg and "low" in msg:
+        return 4
+    return None
+
+
+MESSAGES = [
+    "BTC crossed $70K! Current: 111145.00", "Ethereum price dropped -10% in the last hour",
+    "Demo wallet USDC low", "Demo wallet ETH critically low", "Low balance in wallet 0xabc",
+    "user1 subscription cancelled", "user2 subscription expiring soon (2025-09-01)",
+    "Transaction failed due to insufficient gas", "Circle treasury LOW", "Tx 0x1 confirmed in block 5",
+    "Wallet subscription low",  # several rules match: the first one wins
+]
+
+
+def test_compiled_matcher_keeps_if_elif_priority():
+    advisor = Matcher(recommendations.ADVISOR_RULES)
+    for m in MESSAGES:
+        want = _legacy_advice(m)
+        got = advisor.match(m)
+        assert got is (recommendations.ADVISOR_RULES[want][1] if want is not None else None), m
+
+
+def test_enrichment_and_plans_memoized_by_template():
+    recommendations.advisor_bundle.cache_clear()
+    a = _advisor_style_enrichment({"message": "BTC crossed $70K! Current: 111145.00"})
+    b = _advisor_style_enrichment({"message": "BTC crossed $70K! Current: 99000.12"})
+    assert a["summary"] == ("⚠️ BTC crossed $70K! Current: 111145.00 Suggested actions: "
+                            "✋ Hold position, 💱 Sell 30% to USDC, 💸 Cash out to PayPal")
+    assert b["summary"].startswith("⚠️ BTC crossed $70K! Current: 99000.12")
+    info = recommendations.advisor_bundle.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+
+    assert "summary" not in _advisor_style_enrichment({"message": "all good"})
+    kept = _advisor_style_enrichment({"message": "all good", "recommendations": ["Wait — nothing to do"]})
+    assert kept["summary"].endswith("Suggested actions: Wait")
+
+    assert alert_service.recommend_action({"message": "Demo wallet USDC low"}) == [
+        "Top up USDC manually", "Transfer from backup wallet"]
+    assert alert_service.recommend_action({"message": "something else"}) == ["Investigate issue manually"]
+    plans = alert_service.build_plans({"message": "user3 subscription expiring soon (2025-09-01)"})
+    assert [p["recommendation"] for p in plans] == ["Renew subscription now", "Switch to monthly plan"]
+    assert plans[1]["option"] == "Plan 2" and plans[1]["steps"][0]["args"]["query"] == "Switch to monthly plan"
+
+    plans[0]["steps"].clear()  # callers own what they get back
+    alert_service.recommend_action({"message": "user3 subscription expiring soon"}).append("mutated")
+    again = alert_service.build_plans({"message": "user3 subscription expiring soon (2025-09-01)"})
+    assert again[0]["steps"] and [p["recommendation"] for p in again] == [
+        "Renew subscription now", "Switch to monthly plan"]
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+
+from backend.services.single_flight import SingleFlight
+
+
+def test_sync_callers_share_one_upstream_call():
+    sf = SingleFlight()
+    calls = []
+    gate = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        gate.wait(1)
+        return {"price": 3500.0}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(sf.do(("coingecko", "ethereum"), fetch)))
+               for _ in range(20)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    gate.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1 and results == [{"price": 3500.0}] * 20
+    s = sf.stats()
+    assert (s["calls"], s["upstream"], s["coalesced"], s["in_flight"]) == (20, 1, 19, 0)
+    assert sf.do(("coingecko", "ethereum"), lambda: 1) == 1  # nothing in flight: runs again
+
+
+def test_async_callers_share_result_and_errors():
+    sf = SingleFlight()
+    n = {"calls": 0}
+
+    async def fetch():
+        n["calls"] += 1
+        await asyncio.sleep(0.02)
+        return n["calls"]
+
+    async def boom():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("429")
+
+    async def run():
+        got = await asyncio.gather(*(sf.ado(("coingecko", "bitcoin"), fetch) for _ in range(10)))
+        errs = await asyncio.gather(*(sf.ado(("rpc", "balance:0xabc"), boom) for _ in range(3)),
+                                    return_exceptions=True)
+        return got, errs
+
+    got, errs = asyncio.run(run())
+    assert got == [1] * 10 and n["calls"] == 1
+    assert [str(e) for e in errs] == ["429"] * 3
+    assert sf.stats()["providers"] == {"coingecko": {"calls": 10, "upstream": 1, "coalesced": 9},
+                                       "rpc": {"calls": 3, "upstream": 1, "coalesced": 2}}
+
+
+def test_cancelled_leader_hands_over_to_a_waiter():
+    sf = SingleFlight()
+    started = []
+
+    async def fetch():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return 3500.0
+
+    async def run():
+        leader = asyncio.create_task(sf.ado(("coingecko", "ethereum"), fetch))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(sf.ado(("coingecko", "ethereum"), fetch)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()  # e.g. the leader's client disconnected
+        return leader, await asyncio.gather(*waiters)
+
+    leader, got = asyncio.run(run())
+    assert leader.cancelled() and got == [3500.0] * 3
+    assert len(started) == 2 and sf.stats()["in_flight"] == 0  # one waiter took over, the others shared it
+
+
+def test_sync_waiters_see_leader_exception():
+    sf = SingleFlight()
+
+    def fetch():
+        time.sleep(0.2)
+        raise ValueError("down")
+
+    errors = []
+
+    def call():
+        try:
+            sf.do(("coingecko", "x"), fetch)
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == ["down"] * 5 and sf.stats()["upstream"] == 1
@@ -0,0 +1,50 @@
+import pytest
+from web3 import Web3
+
+from backend.services import crypto_service
+from backend.services.token_registry import TokenMeta, TokenRegistry
+
+DAI = "0x" + "da" * 20   # 18 decimals, ABI string symbol
+MKR = "0x" + "3c" * 20   # 18 decimals, bytes32 symbol
+
+
+@pytest.fixture
+def node(rpc_node):
+    """DAI and MKR: 18 decimals, wallet index / 10 tokens each; MKR answers symbol() as bytes32."""
+    balance = lambda owner: (owner & 0xFFFF) * 10 ** 17
+    rpc_node.erc20(DAI, "DAI", 18, balance).erc20(MKR, "MKR", 18, balance)
+    rpc_node.on_call(MKR, "0x95d89b41", lambda data: "0x" + b"MKR".hex().ljust(64, "0"))
+    return rpc_node
+
+
+def test_registry_memoizes_and_stays_bounded():
+    reg = TokenRegistry(max_entries=2)
+    w3 = Web3()
+    assert reg.checksum(DAI.upper().replace("0X", "0x")) == Web3.to_checksum_address(DAI)
+    assert reg.contract(w3, DAI, crypto_service.ERC20_ABI) is reg.contract(w3, DAI.upper().replace("0X", "0x"),
+                                                                            crypto_service.ERC20_ABI)
+    assert reg.contract(Web3(), DAI, crypto_service.ERC20_ABI) is not reg.contract(w3, DAI, crypto_service.ERC20_ABI)
+
+    fetched = []
+    fetch = lambda cs: fetched.append(cs) or TokenMeta(cs, "T", 6)
+    for token in (DAI, MKR, DAI, "0x" + "11" * 20, DAI):
+        reg.meta(token, fetch)
+    assert len(fetched) == 3 and reg.meta(DAI, fetch).decimals == 6
+    s = reg.stats()
+    assert s["meta"]["size"] == s["checksum"]["size"] == 2 and s["meta"]["hits"] == 3
+
+
+def test_token_balances_fetch_metadata_once(node, monkeypatch):
+    monkeypatch.setattr(crypto_service, "RPC_BATCH_SIZE", 50)
+    wallets = ["0x" + f"{i:040x}" for i in range(1, 101)]
+    res = crypto_service.get_token_balances(wallets + ["0xbad"], DAI)
+    assert node.selectors().count("0x313ce567") == 1 and node.selectors().count("0x70a08231") == 100
+    assert res[wallets[6]] == {"address": wallets[6], "token": Web3.to_checksum_address(DAI), "symbol": "DAI",
+                               "balance": 0.7}
+    assert res["0xbad"]["error"] == "invalid address"
+
+    node.calls.clear()
+    crypto_service.get_token_balances(wallets, DAI)
+    assert set(node.selectors()) == {"0x70a08231"}  # only balanceOf once metadata is cached
+
+    assert crypto_service.token_meta(MKR) == TokenMeta(Web3.to_checksum_address(MKR), "MKR", 18)
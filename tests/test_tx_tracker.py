@@ -0,0 +1,48 @@
+import pytest
+
+from backend.services import crypto_service
+from backend.services.tx_tracker import TxTracker
+
+
+@pytest.fixture
+def chain(rpc_node, monkeypatch):
+    """Tx `0x..{n}` is mined at block n (status 0 when n is divisible by 5); the head is `chain.block`."""
+    def receipt(params):
+        n = int(params[0], 16)
+        return None if n > rpc_node.block else {"status": "0x0" if n % 5 == 0 else "0x1", "blockNumber": hex(n)}
+
+    rpc_node.block = 100
+    rpc_node.on("eth_blockNumber", lambda params: hex(rpc_node.block)).on("eth_getTransactionReceipt", receipt)
+    monkeypatch.setattr(crypto_service, "RPC_BATCH_SIZE", 500)
+    return rpc_node
+
+
+def test_receipts_polled_in_batches_only_on_new_blocks(chain):
+    t = TxTracker(ttl=3600, max_backoff=8)
+    for n in range(1, 2001):
+        t.track("0x" + f"{n:064x}")
+
+    done = t.poll()
+    assert len(done) == 100 and sum(d["status"] == "failed" for d in done) == 20
+    assert chain.requests[0] == ["eth_blockNumber"] and len(chain.requests) == 1 + 4  # 2000 receipts / 500
+    assert len(t) == 1900
+
+    chain.requests.clear()
+    assert t.poll() == [] and chain.requests == [["eth_blockNumber"]]  # same block: no receipt calls
+
+    chain.block = 101  # pending txs backed off 2 blocks -> nothing due yet
+    chain.requests.clear()
+    assert t.poll() == [] and chain.requests == [["eth_blockNumber"]]
+
+    chain.block = 102
+    chain.requests.clear()
+    done = t.poll()
+    assert [d["blockNumber"] for d in done] == [101, 102]
+    assert len(chain.requests) == 1 + 4 and t.stats()["confirmed"] == 82
+
+
+def test_tracked_tx_expires_after_ttl(chain):
+    t = TxTracker(ttl=0)
+    t.track("0x" + f"{10_000:064x}")
+    assert t.poll() == [{"tx_hash": "0x" + f"{10_000:064x}", "status": "expired", "attempts": 0}]
+    assert len(t) == 0 and chain.requests == []
@@ -0,0 +1,52 @@
+import pytest
+
+from backend.services import alert_service, crypto_service, watchlist_service
+
+
+@pytest.fixture
+def rpc(rpc_node):
+    """ETH balance = wallet index * 10**15 wei, USDC = index * 10**6 (the index is the low 16 bits)."""
+    rpc_node.on("eth_getBalance", lambda params: hex(int(params[0][-4:], 16) * 10 ** 15))
+    rpc_node.erc20(crypto_service.USDC_ADDR, "USDC", 6, lambda owner: (owner & 0xFFFF) * 10 ** 6)
+    return rpc_node
+
+
+def _addr(i):
+    return "0x" + f"{i:040x}"
+
+
+def test_get_balances_batches_1000_wallets(rpc, monkeypatch):
+    monkeypatch.setattr(crypto_service, "RPC_BATCH_SIZE", 200)
+    wallets = [_addr(i) for i in range(1, 1001)]
+    res = crypto_service.get_balances(wallets + ["0xnotanaddress"])
+    assert [len(r) for r in rpc.requests] == [2] + [400] * 5  # USDC decimals() + symbol() once, then the balances
+    assert res[_addr(7)]["eth"] == 0.007 and res[_addr(7)]["usdc"] == 7
+    assert res[_addr(1000)]["usdc"] == 1000
+    assert res["0xnotanaddress"]["error"] == "invalid address"
+
+    rpc.requests.clear()
+    crypto_service.get_balances(wallets)
+    assert [len(r) for r in rpc.requests] == [400] * 5
+
+
+def test_watchlist_persists_and_feeds_alert_checks(rpc, tmp_path, monkeypatch):
+    monkeypatch.setattr(watchlist_service, "WATCHLIST_FILE", tmp_path / "watchlist.json")
+    watchlist_service.reload_watchlist()
+    watchlist_service.add_wallet(_addr(5).upper().replace("0X", "0x"), "Treasury")
+    watchlist_service.add_wallet(_addr(5000), "Ops")
+    with pytest.raises(ValueError):
+        watchlist_service.add_wallet("0x1234")
+
+    watchlist_service.reload_watchlist()  # re-read from disk
+    assert [w["label"] for w in watchlist_service.get_watchlist()] == ["Treasury", "Ops"]
+
+    alert_service.clear_alerts()
+    snap = alert_service.MetricsSnapshot()
+    assert alert_service._collect_wallets(snap) == 0
+    assert len(rpc.requests) == 2  # USDC metadata, then demo wallet + both watched wallets in one request
+    assert alert_service.apply_rules(snap) >= 1
+    assert "Treasury USDC low" in [a["message"] for a in alert_service.get_alerts()]
+
+    assert watchlist_service.remove_wallet(_addr(5))
+    assert not watchlist_service.remove_wallet(_addr(5))
+    watchlist_service.reload_watchlist()